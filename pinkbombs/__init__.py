@@ -1,12 +1,9 @@
-from .graphs.viz import make_area_chart, make_area_single_chart, make_area_chart_options
-from .graphs.viz import make_area_order_chart, make_bar_chart, make_area_order_chart_grouped
-from .graphs.viz import make_color_bar_chart, make_color_bar_chart2
-from .graphs.viz import make_treemap_chart
-from .graphs.viz import make_simple_bar_chart, make_simple_pie_chart
-from .graphs.viz import make_simple_box_chart, make_matrix_alternatives
-from .graphs.viz import make_double_yaxis_bar_chart
-from .graphs.maps_viz import make_ras_bubble_map, make_animated_bubble_map
+from . import graphs
 
 # from .router import api
 # from .auth.authenicate import verify_token
 
+
+def __getattr__(name):
+    # Builders are imported lazily by the graphs package
+    return getattr(graphs, name)
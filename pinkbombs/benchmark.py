@@ -0,0 +1,279 @@
+# Benchmark of the graph and map builders: runs each registry entry with warm-up and repeats,
+# records the wall time, the peak memory and the size of the output, and compares them with a
+# baseline. The sizes and peaks are committed, the times depend on the machine and are only
+# compared with a local baseline. Run from the root of the repository:
+#
+#     python pinkbombs/benchmark.py --save-baseline     # on the main branch
+#     python pinkbombs/benchmark.py                     # on a branch, fails on a regression
+#     python pinkbombs/benchmark.py --scale 10 100      # inputs inflated 10x and 100x
+
+from generate import REGISTRIES, entry_arguments, job_key, list_jobs
+from graphs.datacache import read_cached
+from graphs.serialize import figure_to_json
+import argparse
+import fnmatch
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import pandas as pd
+
+BASELINE_PATH = "benchmarks/baseline.json"
+# The times of this machine, not committed
+LOCAL_BASELINE_PATH = "benchmarks/baseline-local.json"
+# The metrics which do not depend on the machine, kept in the committed baseline
+SHARED_METRICS = ("peak_mb", "bytes")
+
+# Increases below these are noise, not regressions
+NOISE_FLOORS = {"peak_mb": 1.0, "bytes": 0}
+# A time increase is noise below this many times the spread of the repeats (slowest - fastest)
+TIME_SPREAD_FACTOR = 3
+
+
+def is_text(column):
+    """Returns True for a column of text which is not numbers, e.g. company names"""
+    if column.dtype != object:
+        return False
+    numbers = pd.to_numeric(
+        column.astype(str).str.replace(r"[,~%\s]", "", regex=True), errors="coerce"
+    )
+    return bool(numbers.isna().all())
+
+
+def label_columns(df):
+    """Returns the text columns naming the entities of the rows
+    They are unique in a wide dataset (e.g. the companies of a top 10). In a long dataset, they
+    are the fewest text columns identifying the rows with its years, e.g. the countries of each
+    year, or the companies and areas of each year.
+    """
+    text = [col for col in df.columns if is_text(df[col])]
+    labels = [col for col in text if df[col].is_unique]
+    years = [
+        col
+        for col in df.columns
+        if pd.api.types.is_integer_dtype(df[col]) and df[col].between(1800, 2200).all()
+    ]
+    if labels or not years:
+        return labels
+    for size in range(1, len(text) + 1):
+        keys = [
+            combination
+            for combination in itertools.combinations(text, size)
+            if not df.duplicated([*combination, *years]).any()
+        ]
+        if keys:
+            return [col for col in text if any(col in key for key in keys)]
+    return []
+
+
+def inflate_frame(df, factor):
+    """Returns a synthetic dataframe with factor times the rows of df
+    The labels of the entities get a suffix in the copies, so that the builders see more
+    companies or countries, each with all its years in a long dataset. The other columns are
+    repeated as they are.
+    Parameters:
+            df (pd.DataFrame): input of a builder
+            factor (int): number of copies of the rows
+    Returns:
+            df (pd.DataFrame): inflated dataframe
+    """
+    if factor == 1:
+        return df
+    labels = label_columns(df)
+    copies = [df]
+    for i in range(1, factor):
+        copies.append(df.assign(**{col: df[col] + f" {i}" for col in labels}))
+    return pd.concat(copies, ignore_index=True)
+
+
+def run_builder(job, df):
+    """Returns the serialised output of a job for a dataframe, as generate.py writes it"""
+    kind, lang, name = job
+    entry = REGISTRIES[(kind, lang)][name]
+    (arguments, kwargs) = entry_arguments(entry)
+    output = entry["function"](df.copy(), *arguments, **kwargs)
+    if kind == "maps":
+        return output
+    # The same serialization as generate.py
+    return figure_to_json(output, precision=entry.get("precision"))
+
+
+def measure(job, df, repeats=5, warmup=1):
+    """Returns the median wall time and its spread, the peak memory and the output size of a job
+    Parameters:
+            job (tuple): (kind, lang, name) job
+            df (pd.DataFrame): input of the builder
+            repeats (int): number of timed runs, default is 5
+            warmup (int): number of runs before timing, default is 1
+    Returns:
+            result (dict): 'time_s', 'time_spread_s', 'peak_mb' and 'bytes'
+    """
+    for _ in range(warmup):
+        run_builder(job, df)
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        output = run_builder(job, df)
+        times.append(time.perf_counter() - start)
+
+    # Separate run as tracemalloc slows down the code it traces
+    tracemalloc.start()
+    run_builder(job, df)
+    (_, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "time_s": statistics.median(times),
+        "time_spread_s": max(times) - min(times),
+        "peak_mb": peak / 2**20,
+        "bytes": len(output.encode()),
+    }
+
+
+def noise_floor(metric, result, reference):
+    """Returns the increase of a metric below which it is noise: the fixed floor of the metric,
+    or for the time a multiple of the largest spread of the repeats of the two runs
+    """
+    if metric == "time_s":
+        spreads = [result.get("time_spread_s", 0), reference.get("time_spread_s", 0)]
+        return TIME_SPREAD_FACTOR * max(spreads)
+    return NOISE_FLOORS.get(metric, 0)
+
+
+def compare(results, baseline, threshold):
+    """Returns the regressions, as messages, of the results above baseline * (1 + threshold) by
+    more than the noise floor of their metric
+    """
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        for metric, value in result.items():
+            if metric == "time_spread_s":
+                continue
+            reference = baseline[key].get(metric)
+            if (
+                reference
+                and value > reference * (1 + threshold)
+                and value - reference > noise_floor(metric, result, baseline[key])
+            ):
+                regressions.append(
+                    f"{key} {metric}: {value:.4g} vs {reference:.4g} "
+                    f"(+{(value / reference - 1):.0%})"
+                )
+    return regressions
+
+
+def load_baselines(paths):
+    """Returns the results of the baseline files which exist, merged per job"""
+    baseline = {}
+    for path in paths:
+        if os.path.exists(path):
+            with open(path) as f:
+                for key, result in json.load(f).items():
+                    baseline.setdefault(key, {}).update(result)
+    return baseline
+
+
+def save_baseline(results, path, metrics):
+    """Writes some metrics of the results in a baseline file, keeping its other jobs"""
+    baseline = load_baselines([path])
+    for key, result in results.items():
+        baseline[key] = {metric: result[metric] for metric in metrics}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def print_results(results, baseline):
+    """Prints a table of the results with the change against the baseline"""
+    print(f"{'job':45} {'time (s)':>10} {'peak (MB)':>10} {'bytes':>10}  vs baseline")
+    for key, result in results.items():
+        change = ""
+        if key in baseline and baseline[key].get("time_s"):
+            change = f"{result['time_s'] / baseline[key]['time_s'] - 1:+.0%} time"
+        print(
+            f"{key:45} {result['time_s']:10.4f} {result['peak_mb']:10.2f} "
+            f"{result['bytes']:10d}  {change}"
+        )
+
+
+def main(argv=None):
+    """Runs the command line interface, returns the exit code"""
+    parser = argparse.ArgumentParser(description="Benchmark the graph and map builders")
+    parser.add_argument("targets", nargs="*", default=["*"], help="job globs, e.g. 'maps/*'")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs (default: 5)")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs (default: 1)")
+    parser.add_argument(
+        "--scale",
+        type=int,
+        nargs="+",
+        default=[1],
+        help="also run with the inputs inflated by these factors, e.g. --scale 1 10 100",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="relative increase reported as a regression (default: 0.2)",
+    )
+    parser.add_argument(
+        "--baseline", default=BASELINE_PATH, help="committed baseline of the sizes and peaks"
+    )
+    parser.add_argument(
+        "--local-baseline", default=LOCAL_BASELINE_PATH, help="baseline of the times, not committed"
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="write the results as the new baseline"
+    )
+    args = parser.parse_args(argv)
+
+    jobs = [
+        job
+        for job in list_jobs()
+        if any(fnmatch.fnmatch(job_key(job), target) for target in args.targets)
+    ]
+
+    results = {}
+    for job in jobs:
+        entry = REGISTRIES[job[:2]][job[2]]
+        path = "data/" + entry["filename"]
+        if not os.path.exists(path):
+            print(f"SKIPPED {job_key(job)}: {path} not found", file=sys.stderr)
+            continue
+        df = read_cached(path, entry["parser"])
+        for factor in args.scale:
+            key = job_key(job) + (f"@x{factor}" if factor != 1 else "")
+            try:
+                results[key] = measure(job, inflate_frame(df, factor), args.repeats, args.warmup)
+            except Exception as e:
+                print(f"FAILED {key}: {e!r}", file=sys.stderr)
+
+    baseline = load_baselines([args.baseline, args.local_baseline])
+    if not args.save_baseline:
+        for path in (args.baseline, args.local_baseline):
+            if not os.path.exists(path):
+                print(f"No baseline in {path}, its metrics are not compared", file=sys.stderr)
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline, SHARED_METRICS)
+        save_baseline(results, args.local_baseline, ("time_s", "time_spread_s"))
+        print(f"Baselines written to {args.baseline} and {args.local_baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}:")
+        print("\n".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+from concurrent.futures import ProcessPoolExecutor
+import gzip
+import json
+import os
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, only the .gz files are written without it
+    brotli = None
+
+# Sizes of the outputs and of their compressed siblings, next to the manifest
+SIZE_REPORT_PATH = "data/sizes.json"
+
+
+def compressors():
+    """Returns the available compressors at their maximum level, by file extension"""
+    # mtime=0 so that the .gz files only change when their content does
+    available = {".gz": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        available[".br"] = lambda data: brotli.compress(data, quality=11)
+    return available
+
+
+def compress_file(path):
+    """Writes the .gz and .br siblings of a file, unless they are already newer than it
+    Parameters:
+            path (str): file to compress
+    Returns:
+            sizes (dict): bytes of the file ('raw') and of each sibling, by extension
+    """
+    sizes = {"raw": os.path.getsize(path)}
+    mtime = os.path.getmtime(path)
+    data = None
+    for extension, compress in compressors().items():
+        target = path + extension
+        if not os.path.exists(target) or os.path.getmtime(target) < mtime:
+            if data is None:
+                with open(path, "rb") as f:
+                    data = f.read()
+            tmp_path = target + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(compress(data))
+            os.replace(tmp_path, target)
+        sizes[extension] = os.path.getsize(target)
+    return sizes
+
+
+def compress_files(paths, n_jobs=1):
+    """Compresses files in parallel
+    Parameters:
+            paths (list(str)): files to compress
+            n_jobs (int): number of worker processes, 1 compresses in this process. Default is 1.
+    Returns:
+            sizes (dict): sizes returned by compress_file, by path
+    """
+    if n_jobs == 1 or len(paths) < 2:
+        return {path: compress_file(path) for path in paths}
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        return dict(zip(paths, executor.map(compress_file, paths)))
+
+
+def update_size_report(sizes, path=SIZE_REPORT_PATH, root="data"):
+    """Merges sizes into the size report, keyed by the paths relative to root"""
+    report = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            report = json.load(f)
+    for file, file_sizes in sizes.items():
+        report[os.path.relpath(file, root)] = file_sizes
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return report
+
+
+def print_size_report(sizes):
+    """Prints the raw and compressed bytes of the files with their totals"""
+    extensions = sorted({extension for s in sizes.values() for extension in s} - {"raw"})
+    print(f"{'file':50} {'raw':>10}" + "".join(f" {ext:>10} {'ratio':>6}" for ext in extensions))
+    totals = dict.fromkeys(["raw", *extensions], 0)
+    for file, file_sizes in sorted(sizes.items()) + [("total", totals)]:
+        if file != "total":
+            for key in totals:
+                totals[key] += file_sizes.get(key, 0)
+        line = f"{file:50} {file_sizes['raw']:10d}"
+        for ext in extensions:
+            ratio = file_sizes[ext] / file_sizes["raw"] if file_sizes["raw"] else 0
+            line += f" {file_sizes[ext]:10d} {ratio:6.1%}"
+        print(line)
@@ -1,12 +1,11 @@
-import pandas as pd
 import graphs as pb
 
 
 MAPPING = {
     "salmon-collapse": {
         "filename": "discrease_wild_salmon_1.1.csv",
-        "function": pb.make_area_single_chart,
-        "parser": pd.read_csv,
+        "function": pb.lazy("viz.make_area_single_chart"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             "Year",
             "Tons of wild salmon catch in Atlantic waters",
@@ -21,8 +20,8 @@ MAPPING = {
     },
     "hyper-growth": {
         "filename": "hyper_growth_salmon_farming_1.2.csv",
-        "function": pb.make_area_order_chart,
-        "parser": pd.read_csv,
+        "function": pb.lazy("viz.make_area_order_chart"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             "Year",
             "Tonnes - live weight",
@@ -36,8 +35,8 @@ MAPPING = {
     },
     "hyper-growth-grouped": {
         "filename": "numbers_salmons_farmed_1.0.csv",
-        "function": pb.make_area_chart_options,
-        "parser": pd.read_csv,
+        "function": pb.lazy("viz.make_area_chart_options"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             "Year",
             "Number of salmons (5kg each)",
@@ -47,8 +46,8 @@ MAPPING = {
     },
     "top-10": {
         "filename": "top_10_countries_producing_1.3.csv",
-        "function": pb.make_color_bar_chart,
-        "parser": pd.read_csv,
+        "function": pb.lazy("viz.make_color_bar_chart"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             "Tons",
             "Country",
@@ -63,11 +62,13 @@ MAPPING = {
             ],
             True,
         ],
+        # Significant digits of the floats, the shares are shown with 1 decimal
+        "precision": 4,
     },
     "top-conso": {
         "filename": "top_15_countries_consuming_1.5.csv",
-        "function": pb.make_double_yaxis_bar_chart,
-        "parser": pd.read_csv,
+        "function": pb.lazy("viz.make_double_yaxis_bar_chart"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             "Country",
             "Flag",
@@ -91,8 +92,8 @@ MAPPING = {
     },
     "top-comp": {
         "filename": "top_10_companies_producing_2.1.csv",
-        "function": pb.make_simple_bar_chart,
-        "parser": pd.read_csv,
+        "function": pb.lazy("viz.make_simple_bar_chart"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             "Volume, in tons, 2022",
             "Company",
@@ -117,8 +118,8 @@ MAPPING = {
     },
     "top-land": {
         "filename": "top_10_ras_companies_2.3.csv",
-        "function": pb.make_simple_bar_chart,
-        "parser": pd.read_csv,
+        "function": pb.lazy("viz.make_simple_bar_chart"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             "Production in tonnes",
             "Parent company",
@@ -140,8 +141,8 @@ MAPPING = {
     },
     "mortality-rates": {
         "filename": "mortality_rates_4.4.csv",
-        "function": pb.make_simple_box_chart,
-        "parser": pd.read_csv,
+        "function": pb.lazy("viz.make_simple_box_chart"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             "Company",
             "Mortality_rate",
@@ -153,8 +154,8 @@ MAPPING = {
     },
     "alternatives": {
         "filename": "alternatives_text_7.csv",
-        "function": pb.make_matrix_alternatives,
-        "parser": pd.read_csv,
+        "function": pb.lazy("viz.make_matrix_alternatives"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             60,
             None,
@@ -170,8 +171,9 @@ MAPPING = {
 MAPS = {
     "ras-map": {
         "filename": "ras_projects_for_map_2.4.csv",
-        "function": pb.make_ras_bubble_map,
-        "parser": pd.read_csv,
+        "function": pb.lazy("maps_viz.make_ras_bubble_map"),
+        "parser": pb.read_typed_csv,
+        "sidecar": True,
         "arguments": [
             "Electricity consumption",
             "Carbon footprint",
@@ -180,11 +182,14 @@ MAPS = {
             True,
             False,
         ],
+        "kwargs": {
+            "client_popups": True,
+        },
     },
     "evolution-map": {
         "filename": "evolution_salmon_farming_country_iso_1.4.csv",
-        "function": pb.make_animated_bubble_map,
-        "parser": pd.read_csv,
+        "function": pb.lazy("maps_viz.make_animated_bubble_map"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             "alpha-3",
             "Country",
@@ -198,14 +203,18 @@ MAPS = {
                 '#151c97',
             ],
         ],
+        "kwargs": {
+            "include_plotlyjs": "shared",
+            "compact": True,
+        },
     },
 }
 
 MAPPINGFR = {
     "salmon-collapse": {
         "filename": "discrease_wild_salmon_1.1_fr.csv",
-        "function": pb.make_area_single_chart,
-        "parser": pd.read_csv,
+        "function": pb.lazy("viz.make_area_single_chart"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             "Année",
             "Saumons pêchés dans l'Atlantique en tonnes",
@@ -220,8 +229,8 @@ MAPPINGFR = {
     },
     "hyper-growth": {
         "filename": "hyper_growth_salmon_farming_1.2_fr.csv",
-        "function": pb.make_area_order_chart,
-        "parser": pd.read_csv,
+        "function": pb.lazy("viz.make_area_order_chart"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             "Année",
             "Tonnes de saumons produits en élevage",
@@ -235,8 +244,8 @@ MAPPINGFR = {
     },
     "hyper-growth-grouped": {
         "filename": "numbers_salmons_farmed_1.0_fr.csv",
-        "function": pb.make_area_chart_options,
-        "parser": pd.read_csv,
+        "function": pb.lazy("viz.make_area_chart_options"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             "Année",
             "Nombre de saumons (5kg chacun)",
@@ -246,8 +255,8 @@ MAPPINGFR = {
     },   
     "top-10": {
         "filename": "top_10_countries_producing_1.3_fr.csv",
-        "function": pb.make_color_bar_chart,
-        "parser": pd.read_csv,
+        "function": pb.lazy("viz.make_color_bar_chart"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             "Tonnes de saumon",
             "Pays",
@@ -262,11 +271,13 @@ MAPPINGFR = {
             ],
             True,
         ],
+        # Significant digits of the floats, the shares are shown with 1 decimal
+        "precision": 4,
     },
     "top-conso": {
         "filename": "top_15_countries_consuming_1.5_fr.csv",
-        "function": pb.make_double_yaxis_bar_chart,
-        "parser": pd.read_csv,
+        "function": pb.lazy("viz.make_double_yaxis_bar_chart"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             "Pays",
             "Drapeau",
@@ -290,8 +301,8 @@ MAPPINGFR = {
     },
     "top-comp": {
         "filename": "top_10_companies_producing_2.1_fr.csv",
-        "function": pb.make_simple_bar_chart,
-        "parser": pd.read_csv,
+        "function": pb.lazy("viz.make_simple_bar_chart"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             "Tonnes de saumon 2022",
             "Producteur",
@@ -316,8 +327,8 @@ MAPPINGFR = {
     },
     "top-land": {
         "filename": "top_10_ras_companies_2.3_fr.csv",
-        "function": pb.make_simple_bar_chart,
-        "parser": pd.read_csv,
+        "function": pb.lazy("viz.make_simple_bar_chart"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             "Production en tonnes",
             "Producteur",
@@ -339,8 +350,8 @@ MAPPINGFR = {
     },
     "mortality-rates": {
         "filename": "mortality_rates_4.4_fr.csv",
-        "function": pb.make_simple_box_chart,
-        "parser": pd.read_csv,
+        "function": pb.lazy("viz.make_simple_box_chart"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             "Producteur",
             "Taux de mortalité",
@@ -352,8 +363,8 @@ MAPPINGFR = {
     },
     "alternatives": {
         "filename": "alternatives_text_7_fr.csv",
-        "function": pb.make_matrix_alternatives,
-        "parser": pd.read_csv,
+        "function": pb.lazy("viz.make_matrix_alternatives"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             60,
             None,
@@ -369,21 +380,25 @@ MAPPINGFR = {
 MAPSFR = {
     "ras-map": {
         "filename": "ras_projects_for_map_2.4_fr.csv",
-        "function": pb.make_ras_bubble_map,
-        "parser": pd.read_csv,
+        "function": pb.lazy("maps_viz.make_ras_bubble_map"),
+        "parser": pb.read_typed_csv,
+        "sidecar": True,
         "arguments": [
             "Consommation d'électricité",
             "Empreinte carbone",
             "Fermes-usines représentées par:",
             None,
             True,
-            True
+            True,
         ],
+        "kwargs": {
+            "client_popups": True,
+        },
     },
     "evolution-map": {
         "filename": "evolution_salmon_farming_country_iso_1.4_fr.csv",
-        "function": pb.make_animated_bubble_map,
-        "parser": pd.read_csv,
+        "function": pb.lazy("maps_viz.make_animated_bubble_map"),
+        "parser": pb.read_typed_csv,
         "arguments": [
             "alpha-3",
             "Pays",
@@ -397,5 +412,9 @@ MAPSFR = {
                 '#151c97',
             ],
         ],
+        "kwargs": {
+            "include_plotlyjs": "shared",
+            "compact": True,
+        },
     },
 }
\ No newline at end of file
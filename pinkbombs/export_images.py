@@ -0,0 +1,275 @@
+from generate import REGISTRIES, build_figure, job_key, list_jobs, select_jobs
+from manifest import MANIFEST_PATH, job_fingerprint, load_manifest, save_manifest
+from translate import sources_of, translate
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import importlib.util
+import os
+import sys
+import traceback
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional, the PNG files are then written as kaleido renders them
+    Image = None
+
+# Static images of the graphs for download, named after their data file
+IMAGE_DIR = "download/graphs_image"
+IMAGE_FORMATS = ["png", "svg", "webp"]
+
+# Size of the images in CSS pixels, the raster formats are multiplied by the scale
+IMAGE_SIZE = (1000, 600)
+IMAGE_SCALE = 2
+
+
+def parse_size(size):
+    """Returns (width, height) from a 'WIDTHxHEIGHT' string, e.g. '1000x600'"""
+    (width, height) = size.lower().split("x")
+    return (int(width), int(height))
+
+
+def image_path(job, image_format, size=None, out_dir=IMAGE_DIR):
+    """Returns the path of an image of a graph job, e.g. 'download/graphs_image/x_fr.png'
+    Parameters:
+            job (tuple): (kind, lang, name) job of a graph
+            image_format (str): 'png', 'svg' or 'webp'
+            size (tuple): (width, height) added to the name, default is None for no size
+            out_dir (str): directory of the images, default is 'download/graphs_image'
+    Returns:
+            path (str): path of the image
+    """
+    stem = os.path.splitext(REGISTRIES[job[:2]][job[2]]["filename"])[0]
+    suffix = "" if size is None else f"_{size[0]}x{size[1]}"
+    return f"{out_dir}/{stem}{suffix}.{image_format}"
+
+
+def list_images(jobs, formats, sizes, scale=IMAGE_SCALE, out_dir=IMAGE_DIR):
+    """Returns the images to export, by job
+    The size is only added to the names when there are several sizes.
+    Returns:
+            images (dict): list of (path, options) by job, the options being the arguments
+                of plotly's to_image
+    """
+    return {
+        job: [
+            (
+                image_path(job, image_format, size if len(sizes) > 1 else None, out_dir),
+                {"format": image_format, "width": size[0], "height": size[1], "scale": scale},
+            )
+            for image_format in formats
+            for size in sizes
+        ]
+        for job in jobs
+    }
+
+
+def image_key(path, out_dir=IMAGE_DIR):
+    """Returns the key of an image in the manifest, e.g. 'images/x_fr.png'"""
+    return "images/" + os.path.relpath(path, out_dir)
+
+
+def start_exporter():
+    """Starts the browser engine of kaleido in this process, so that its startup is paid once per
+    worker and not once per image
+    """
+    import kaleido
+    import plotly.graph_objects as go
+
+    if hasattr(kaleido, "start_sync_server"):  # kaleido >= 1.0 otherwise starts one per image
+        kaleido.start_sync_server(silence_warnings=True)
+    go.Figure().to_image(format="png", width=10, height=10)
+
+
+def optimize_png(path):
+    """Compresses a PNG file again without loss, keeping it only if it is smaller"""
+    if Image is None:
+        return
+    tmp_path = path + ".opt"
+    with Image.open(path) as image:
+        image.save(tmp_path, format="PNG", optimize=True)
+    if os.path.getsize(tmp_path) < os.path.getsize(path):
+        os.replace(tmp_path, path)
+    else:
+        os.remove(tmp_path)
+
+
+def export_job(job, images):
+    """Builds the figure of a job once and writes all its images
+    Parameters:
+            job (tuple): (kind, lang, name) job of a graph
+            images (list(tuple)): (path, options) of the images
+    Returns:
+            errors (dict): formatted traceback by path of the images which failed
+    """
+    errors = {}
+    try:
+        fig = build_figure(job[2], REGISTRIES[job[:2]])
+    except Exception:
+        return dict.fromkeys([path for (path, _) in images], traceback.format_exc())
+    for path, options in images:
+        try:
+            content = fig.to_image(**options)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            if options["format"] == "png":
+                optimize_png(path)
+        except Exception:
+            errors[path] = traceback.format_exc()
+    return errors
+
+
+def export(images, n_jobs=1):
+    """Exports the images, with a pool of persistent exporter processes
+    Parameters:
+            images (dict): list of (path, options) by job, from list_images
+            n_jobs (int): number of worker processes, 1 exports in this process. Default is 1.
+    Returns:
+            errors (dict): traceback of each failed image, a failure does not stop the others
+    """
+    errors = {}
+
+    def collect(job, job_errors):
+        errors.update(job_errors)
+        for path, _ in images[job]:
+            if path in job_errors:
+                print(f"FAILED {path}\n{job_errors[path]}", file=sys.stderr)
+            else:
+                print(path)
+
+    if n_jobs == 1:
+        start_exporter()
+        for job, job_images in images.items():
+            collect(job, export_job(job, job_images))
+        return errors
+
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=start_exporter) as executor:
+        futures = {
+            executor.submit(export_job, job, job_images): job
+            for job, job_images in images.items()
+        }
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                job_errors = future.result()
+            except Exception:
+                # The worker itself died, e.g. its browser could not start
+                error = traceback.format_exc()
+                job_errors = dict.fromkeys([path for (path, _) in images[job]], error)
+            collect(job, job_errors)
+    return errors
+
+
+def main(argv=None):
+    """Runs the command line interface, returns the exit code"""
+    parser = argparse.ArgumentParser(description="Export the graphs as static images")
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        help="globs on the names or keys of the graphs, e.g. 'top-*' (default: all)",
+    )
+    parser.add_argument(
+        "--lang", choices=["en", "fr"], action="append", help="only this language, repeatable"
+    )
+    parser.add_argument(
+        "--format",
+        choices=IMAGE_FORMATS,
+        action="append",
+        help="image format, repeatable (default: png)",
+    )
+    parser.add_argument(
+        "--size",
+        type=parse_size,
+        action="append",
+        help=f"WIDTHxHEIGHT in CSS pixels, repeatable (default: {IMAGE_SIZE[0]}x{IMAGE_SIZE[1]})",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=IMAGE_SCALE,
+        help=f"pixels per CSS pixel of the raster formats (default: {IMAGE_SCALE})",
+    )
+    parser.add_argument(
+        "--out", default=IMAGE_DIR, help=f"directory of the images (default: {IMAGE_DIR})"
+    )
+    parser.add_argument(
+        "-n",
+        "--dry-run",
+        action="store_true",
+        help="print the images and whether they are up to date, without exporting them",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of exporter processes, 0 uses all the cores (default: 1)",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="export every image, even the up to date ones"
+    )
+    args = parser.parse_args(argv)
+
+    jobs = select_jobs(list_jobs(), args.targets, args.lang, ["graphs"])
+    if not jobs:
+        print("No graph matches " + " ".join(args.targets or ["*"]), file=sys.stderr)
+        return 2
+    if not args.dry_run and importlib.util.find_spec("kaleido") is None:
+        print("The images are exported with kaleido: pip install kaleido", file=sys.stderr)
+        return 1
+
+    if not args.dry_run:
+        translate(sources_of({REGISTRIES[job[:2]][job[2]]["filename"] for job in jobs}))
+    images = list_images(
+        jobs, args.format or ["png"], args.size or [IMAGE_SIZE], args.scale, args.out
+    )
+
+    # The fingerprints of the build, with the export options, so that the images are only
+    # exported again when their graph or their options change
+    fingerprints = {
+        path: job_fingerprint(REGISTRIES[job[:2]][job[2]], options)
+        for job, job_images in images.items()
+        for (path, options) in job_images
+    }
+    manifest = {} if args.force else load_manifest(MANIFEST_PATH)
+    todo = {}
+    for job, job_images in images.items():
+        stale = [
+            (path, options)
+            for (path, options) in job_images
+            if fingerprints[path] is None
+            or manifest.get(image_key(path, args.out)) != fingerprints[path]
+            or not os.path.exists(path)
+        ]
+        if stale:
+            todo[job] = stale
+
+    if args.dry_run:
+        for job, job_images in images.items():
+            for path, _ in job_images:
+                status = "export" if path in dict(todo.get(job, [])) else "up to date"
+                print(f"{status:10} {job_key(job):30} {path}")
+        return 0
+
+    n_images = sum(len(job_images) for job_images in todo.values())
+    print(f"{n_images} image(s) to export, {len(fingerprints) - n_images} up to date")
+    n_jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+    errors = export(todo, min(n_jobs, max(len(todo), 1)))
+
+    manifest = load_manifest(MANIFEST_PATH)
+    for job_images in todo.values():
+        for path, _ in job_images:
+            if path not in errors:
+                manifest[image_key(path, args.out)] = fingerprints[path]
+    save_manifest(manifest, MANIFEST_PATH)
+
+    if errors:
+        print(f"{len(errors)} image(s) failed: " + ", ".join(errors))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,50 +1,376 @@
 from config import MAPPING, MAPS, MAPPINGFR, MAPSFR
-import json
+from manifest import job_fingerprint, load_manifest, save_manifest
+from compress import compress_files, print_size_report, update_size_report
+from translate import sources_of, stale_translations, translate, translated_filename
+from graphs.serialize import figure_to_json
+from graphs.datacache import read_cached
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import fnmatch
+import os
+import subprocess
+import sys
+import traceback
 
-def generate_graph(graph_name, mapping):
+# Heavy dependencies, only imported by the jobs which need them
+HEAVY_MODULES = ["plotly.express", "plotly.offline", "geopandas", "folium", "branca", "shapely"]
+
+# Registries to build, keyed by (kind, language)
+REGISTRIES = {
+    ("graphs", "en"): MAPPING,
+    ("graphs", "fr"): MAPPINGFR,
+    ("maps", "en"): MAPS,
+    ("maps", "fr"): MAPSFR,
+}
+
+
+def entry_arguments(entry, arguments=None):
+    """Returns the positional and keyword arguments of the function of a registry entry
+    Parameters:
+            entry (dict): registry entry from config.py
+            arguments (list): all the arguments of the function replacing the ones and the
+                "kwargs" of the entry, e.g. from server.resolve_arguments. Default is None.
+    Returns:
+            arguments (list): positional arguments, after the dataframe
+            kwargs (dict): keyword arguments
+    """
+    if arguments is not None:
+        return list(arguments), {}
+    return list(entry["arguments"]), dict(entry.get("kwargs", {}))
+
+
+def build_figure(graph_name, mapping, arguments=None):
+    """Returns the plotly figure of a graph of a registry, before serialization"""
     if graph_name not in mapping:
         raise ValueError(f"Graph '{graph_name}' not found")
-    df = mapping[graph_name]["parser"](
+    df = read_cached(
         "data/" + mapping[graph_name]["filename"],
+        mapping[graph_name]["parser"],
+    )
+    (arguments, kwargs) = entry_arguments(mapping[graph_name], arguments)
+    return mapping[graph_name]["function"](df, *arguments, **kwargs)
+
+
+def generate_graph(graph_name, mapping, compact=False, arguments=None):
+    chart_obj = build_figure(graph_name, mapping, arguments)
+    return figure_to_json(
+        chart_obj, compact=compact, precision=mapping[graph_name].get("precision")
     )
-    chart_obj = mapping[graph_name]["function"](df, *mapping[graph_name]["arguments"])
-    return chart_obj.to_json()
 
 
-def generate_map(map_name, mapping):
+def generate_map(map_name, mapping, arguments=None, data_dir=None):
     if map_name not in mapping:
         raise ValueError(f"Map '{map_name}' not found")
-    df = mapping[map_name]["parser"](
+    df = read_cached(
         "data/" + mapping[map_name]["filename"],
+        mapping[map_name]["parser"],
     )
-    html_map = mapping[map_name]["function"](df, *mapping[map_name]["arguments"])
+    (arguments, kwargs) = entry_arguments(mapping[map_name], arguments)
+    # The maps with a "sidecar" entry write their data next to them, fetched by the page
+    if data_dir is not None and mapping[map_name].get("sidecar"):
+        kwargs["data_dir"] = data_dir
+    html_map = mapping[map_name]["function"](df, *arguments, **kwargs)
     return html_map
 
 
+def list_jobs():
+    """Returns all the (kind, lang, name) jobs defined in the registries"""
+    return [(kind, lang, name) for (kind, lang), mapping in REGISTRIES.items() for name in mapping]
+
+
+def select_jobs(jobs, targets=None, langs=None, kinds=None):
+    """Returns the jobs matching the filters, a filter left to None matches everything
+    Parameters:
+            jobs (list(tuple)): (kind, lang, name) jobs
+            targets (list(str)): globs on the names or on the keys, e.g. 'hyper-*' or 'maps/fr/*'
+            langs (list(str)): languages to keep, e.g. ['en']
+            kinds (list(str)): kinds to keep, 'graphs' and/or 'maps'
+    Returns:
+            jobs (list(tuple)): selected jobs, in the order of the registries
+    """
+    return [
+        job
+        for job in jobs
+        if (not langs or job[1] in langs)
+        and (not kinds or job[0] in kinds)
+        and (
+            not targets
+            or any(
+                fnmatch.fnmatch(job[2], target) or fnmatch.fnmatch(job_key(job), target)
+                for target in targets
+            )
+        )
+    ]
+
+
+def job_key(job):
+    """Returns the key of a job in the manifest and in the logs, e.g. 'graphs/en/top-10'"""
+    return "/".join(job)
+
+
+def fingerprint_jobs(jobs, options=None):
+    """Returns the fingerprint of each job's inputs, including the build options"""
+    return {job: job_fingerprint(REGISTRIES[job[:2]][job[2]], options) for job in jobs}
+
+
+def stale_jobs(jobs, fingerprints, manifest, out_dir="data"):
+    """Returns the jobs whose inputs changed since the last build or whose output is missing"""
+    return [
+        job
+        for job in jobs
+        if fingerprints[job] is None
+        or manifest.get(job_key(job)) != fingerprints[job]
+        or not os.path.exists(output_path(job, out_dir))
+    ]
+
+
+def input_path(job):
+    """Returns the path of the data file read by a (kind, lang, name) job"""
+    return "data/" + REGISTRIES[job[:2]][job[2]]["filename"]
+
+
+def output_path(job, out_dir="data"):
+    """Returns the path of the file written for a (kind, lang, name) job"""
+    kind, lang, name = job
+    extension = "json" if kind == "graphs" else "html"
+    return f"{out_dir}/{kind}/{lang}/{name}.{extension}"
+
+
+def render_job(job, options=None, arguments=None, out_dir="data"):
+    """Returns the content to write for a (kind, lang, name) job
+    Parameters:
+            job (tuple): kind ('graphs' or 'maps'), language ('en' or 'fr') and name
+            options (dict): build options, e.g. {"compact": True}. Default is None.
+            arguments (list): arguments of the function replacing the ones of the entry,
+                default is None
+            out_dir (str): root directory of the outputs, where the shared assets are written,
+                default is 'data'
+    Returns:
+            content (str): json string for graphs, html string for maps
+    """
+    options = options or {}
+    kind, lang, name = job
+    mapping = REGISTRIES[(kind, lang)]
+    if kind == "graphs":
+        return generate_graph(
+            name, mapping, compact=options.get("compact", False), arguments=arguments
+        )
+    data_dir = None
+    if options.get("sidecar_data"):
+        data_dir = os.path.join(out_dir, "maps", lang)
+    return generate_map(name, mapping, arguments=arguments, data_dir=data_dir)
+
+
+def run_job(job, options=None, out_dir="data"):
+    """Returns (content, error) for a job, the error being the formatted traceback if it failed.
+    The traceback is formatted here as it does not survive the trip back from a worker process.
+    """
+    try:
+        return (render_job(job, options, out_dir=out_dir), None)
+    except Exception:
+        return (None, traceback.format_exc())
+
+
+def write_output(job, content, out_dir="data"):
+    """Writes the content of a job to its output file"""
+    path = output_path(job, out_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def import_time(module):
+    """Returns the time in seconds to import a module in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    # Last line of the report: "import time: self | cumulative | module", in microseconds
+    return int(result.stderr.strip().splitlines()[-1].split("|")[1]) / 1e6
+
+
+def import_report(modules=HEAVY_MODULES):
+    """Prints the modules imported so far with their cost, and the heavy ones not imported"""
+    print(f"{len(sys.modules)} modules imported at startup")
+    for module in modules:
+        status = "imported" if module in sys.modules else "not imported"
+        print(f"  {module:20} {import_time(module):6.2f}s  {status}")
+
+
+def build(jobs, n_jobs=1, options=None, out_dir="data"):
+    """Renders the jobs and writes each output as soon as it is available
+    Parameters:
+            jobs (list(tuple)): (kind, lang, name) jobs to build
+            n_jobs (int): number of worker processes, 1 builds in this process. Default is 1.
+            options (dict): build options passed to render_job. Default is None.
+            out_dir (str): root directory of the outputs, default is 'data'
+    Returns:
+            errors (dict): traceback of each failed job, a failure does not stop the other jobs
+    """
+    errors = {}
+
+    def collect(job, content, error):
+        if error is not None:
+            errors[job] = error
+            print(f"FAILED {job_key(job)}\n{error}", file=sys.stderr)
+        else:
+            write_output(job, content, out_dir)
+            print(job_key(job))
+
+    if n_jobs == 1:
+        for job in jobs:
+            collect(job, *run_job(job, options, out_dir))
+        return errors
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        futures = {executor.submit(run_job, job, options, out_dir): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                (content, error) = future.result()
+            except Exception:
+                # The worker itself died (e.g. out of memory)
+                (content, error) = (None, traceback.format_exc())
+            collect(job, content, error)
+    return errors
+
+
+def main(argv=None):
+    """Runs the command line interface, returns the exit code"""
+    parser = argparse.ArgumentParser(description="Generate the graphs and maps of the website")
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        help="globs on the names or keys of the jobs, e.g. 'hyper-*' or 'maps/fr/*' (default: all)",
+    )
+    parser.add_argument(
+        "--lang", choices=["en", "fr"], action="append", help="only this language, repeatable"
+    )
+    parser.add_argument(
+        "--kind", choices=["graphs", "maps"], action="append", help="only this kind, repeatable"
+    )
+    parser.add_argument(
+        "--out", default="data", help="root directory of the outputs (default: data)"
+    )
+    parser.add_argument(
+        "-n",
+        "--dry-run",
+        action="store_true",
+        help="print the planned jobs with their input files, without building them",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes, 0 uses all the cores (default: 1)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="rebuild every job, even the ones whose inputs did not change",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="encode the numeric arrays of the graphs as base64 typed arrays (plotly.js >= 2.28)",
+    )
+    parser.add_argument(
+        "--sidecar-data",
+        action="store_true",
+        help="write the data of the maps which support it in versioned .json files next to "
+        "them, fetched by the page, instead of inlining it",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="also write .gz and .br files of the outputs and a size report, sizes.json",
+    )
+    parser.add_argument(
+        "--import-report",
+        action="store_true",
+        help="print which heavy dependencies are imported before the jobs run, and their cost",
+    )
+    args = parser.parse_args(argv)
+    options = {
+        "compact": args.compact,
+        "sidecar_data": args.sidecar_data,
+    }
+    manifest_path = os.path.join(args.out, "manifest.json")
+
+    jobs = select_jobs(list_jobs(), args.targets, args.lang, args.kind)
+    if not jobs:
+        print("No job matches " + " ".join(args.targets or ["*"]), file=sys.stderr)
+        return 2
+
+    # The French datasets the jobs read are translated first, so that their fingerprints see it
+    sources = sources_of({REGISTRIES[job[:2]][job[2]]["filename"] for job in jobs})
+    if args.dry_run:
+        translations = stale_translations(
+            sources, {} if args.force else load_manifest(manifest_path)
+        )
+        translated = {"data/" + translated_filename(source) for source in translations}
+        for source in translations:
+            print(f"{'translate':10} {'':30} data/{source} -> data/{translated_filename(source)}")
+    else:
+        for path in translate(sources, force=args.force, manifest_path=manifest_path):
+            print(f"translated {path}")
+
+    fingerprints = fingerprint_jobs(jobs, options)
+    manifest = {} if args.force else load_manifest(manifest_path)
+    todo = stale_jobs(jobs, fingerprints, manifest, args.out)
+
+    if args.dry_run:
+        for job in jobs:
+            status = "build" if job in todo or input_path(job) in translated else "up to date"
+            output = output_path(job, args.out)
+            print(f"{status:10} {job_key(job):30} {input_path(job)} -> {output}")
+        return 0
+
+    print(f"{len(todo)} job(s) to build, {len(jobs) - len(todo)} up to date")
+    if args.import_report:
+        import_report()
+
+    n_jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+    errors = build(todo, n_jobs=n_jobs, options=options, out_dir=args.out)
+
+    # Maps built with include_plotlyjs="shared" load this single bundle
+    plotlyjs = []
+    if any(job[0] == "maps" for job in jobs):
+        from graphs.maps_viz import write_plotlyjs
+
+        plotlyjs.append(write_plotlyjs(os.path.join(args.out, "maps")))
+
+    if args.compress:
+        # Up to date siblings are kept, so only the new outputs are compressed again
+        outputs = [output_path(job, args.out) for job in jobs if job not in errors]
+        if args.sidecar_data:
+            for lang in sorted({job[1] for job in jobs if job[0] == "maps"}):
+                maps_dir = os.path.join(args.out, "maps", lang)
+                if os.path.isdir(maps_dir):
+                    outputs += [
+                        os.path.join(maps_dir, filename)
+                        for filename in sorted(os.listdir(maps_dir))
+                        if filename.endswith(".json")
+                    ]
+        outputs = [path for path in outputs + plotlyjs if os.path.exists(path)]
+        sizes = compress_files(outputs, n_jobs)
+        update_size_report(sizes, os.path.join(args.out, "sizes.json"), args.out)
+        print_size_report({os.path.relpath(path, args.out): s for path, s in sizes.items()})
+
+    # Only record the jobs that succeeded so that the failed ones are retried next time
+    manifest = load_manifest(manifest_path)
+    for job in todo:
+        if job not in errors:
+            manifest[job_key(job)] = fingerprints[job]
+    save_manifest(manifest, manifest_path)
+
+    if errors:
+        print(f"{len(errors)} job(s) failed: " + ", ".join(job_key(job) for job in errors))
+        return 1
+    return 0
+
+
 if __name__ == "__main__":
-    for graph_name in MAPPING:
-        print(graph_name)
-        graph_json = generate_graph(graph_name, MAPPING)
-        with open(f"data/graphs/en/{graph_name}.json", "w") as f:
-            json.dump(graph_json, f)
-
-    for graph_name in MAPPINGFR:
-        print(graph_name)
-        graph_json = generate_graph(graph_name, MAPPINGFR)
-        with open(f"data/graphs/fr/{graph_name}.json", "w") as f:
-            json.dump(graph_json, f)
-
-    for map_name in MAPS:
-        print(map_name)
-        map_json = generate_map(map_name, MAPS)
-        with open(f"data/maps/en/{map_name}.html", "w") as f:
-            f.write(map_json)
-
-    for map_name in MAPSFR:
-        print(map_name)
-        map_json = generate_map(map_name, MAPSFR)
-        with open(f"data/maps/fr/{map_name}.html", "w") as f:
-            f.write(map_json)
-
-    
-    
\ No newline at end of file
+    sys.exit(main())
@@ -1,8 +1,35 @@
-from .viz import make_area_chart, make_area_single_chart, make_area_chart_options
-from .viz import make_area_order_chart, make_bar_chart, make_area_order_chart_grouped
-from .viz import make_color_bar_chart, make_color_bar_chart2
-from .viz import make_treemap_chart
-from .viz import make_simple_bar_chart, make_simple_pie_chart
-from .viz import make_simple_box_chart, make_matrix_alternatives
-from .viz import make_double_yaxis_bar_chart
-from .maps_viz import make_ras_bubble_map, make_animated_bubble_map
\ No newline at end of file
+import importlib
+from .lazy import lazy  # noqa: F401
+from .schemas import read_typed_csv  # noqa: F401
+
+# The builders are imported from their module on first access, so that importing the package
+# does not import plotly, geopandas and folium
+BUILDERS = {
+    "make_area_chart": "viz",
+    "make_area_single_chart": "viz",
+    "make_area_chart_options": "viz",
+    "make_area_order_chart": "viz",
+    "make_bar_chart": "viz",
+    "make_area_order_chart_grouped": "viz",
+    "make_color_bar_chart": "viz",
+    "make_color_bar_chart2": "viz",
+    "make_treemap_chart": "viz",
+    "make_simple_bar_chart": "viz",
+    "make_simple_pie_chart": "viz",
+    "make_simple_box_chart": "viz",
+    "make_matrix_alternatives": "viz",
+    "make_double_yaxis_bar_chart": "viz",
+    "make_ras_bubble_map": "maps_viz",
+    "make_animated_bubble_map": "maps_viz",
+}
+
+
+def __getattr__(name):
+    if name in BUILDERS:
+        module = importlib.import_module("." + BUILDERS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(BUILDERS))
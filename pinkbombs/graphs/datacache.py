@@ -0,0 +1,87 @@
+import glob
+import hashlib
+import json
+import contextlib
+import os
+import tempfile
+import numpy as np
+from .schemas import SCHEMAS, read_typed_csv
+
+try:
+    import pyarrow
+    import pyarrow.feather
+except ImportError:
+    pyarrow = None
+
+# Parsed inputs are cached here as feather files
+CACHE_DIR = "data/.cache"
+
+def cache_path(path, parser=read_typed_csv, cache_dir=CACHE_DIR):
+    """Returns the path of the cached frame of a file, which changes when the file is modified
+    Parameters:
+            path (str): path of the input file
+            parser (function): function parsing the file, e.g. read_typed_csv
+            cache_dir (str): directory of the cache, default is 'data/.cache'
+    Returns:
+            path (str): path of the feather file
+    """
+    stat = os.stat(path)
+    key = f"{parser.__module__}.{parser.__qualname__}-{stat.st_mtime_ns}-{stat.st_size}"
+    # A new schema of the dataset gives new dtypes
+    key += json.dumps(SCHEMAS.get(os.path.basename(path)), sort_keys=True)
+    name = os.path.basename(path) + "-" + hashlib.sha256(key.encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, name + ".feather")
+
+
+def read_cached(path, parser=read_typed_csv, cache_dir=CACHE_DIR):
+    """Returns the dataframe of a file, parsed once then loaded from a columnar cache
+    Parameters:
+            path (str): path of the input file
+            parser (function): function parsing the file, default is read_typed_csv which
+                applies the schema of the dataset
+            cache_dir (str): directory of the cache, default is 'data/.cache'
+    Returns:
+            df (pd.DataFrame): parsed dataframe, a new object at each call
+    """
+    if pyarrow is None:
+        return parser(path)
+
+    cached = cache_path(path, parser, cache_dir)
+    if os.path.exists(cached):
+        try:
+            df = pyarrow.feather.read_table(cached, memory_map=True).to_pandas()
+        except (OSError, pyarrow.ArrowException):
+            # e.g. removed by a build of a newer version of the file, parsed again below
+            df = None
+        if df is not None:
+            # Missing strings come back as None, read_csv gives NaN
+            text = df.columns[df.dtypes == object]
+            df[text] = df[text].fillna(np.nan)
+            return df
+
+    df = parser(path)
+    # The cache is best effort, a frame which cannot be written is just parsed again next time
+    tmp = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Drop the frames of the previous versions of the file, never the temporary files of
+        # concurrent writers
+        pattern = glob.escape(os.path.basename(path)) + "-*.feather"
+        for old in glob.glob(os.path.join(cache_dir, pattern)):
+            if old != cached:
+                with contextlib.suppress(FileNotFoundError):  # removed by a concurrent build
+                    os.remove(old)
+        # Written to a temporary file unique to this thread, so that concurrent builds and
+        # server threads never read a partial file
+        with tempfile.NamedTemporaryFile(
+            dir=cache_dir, prefix=os.path.basename(cached) + ".", suffix=".tmp", delete=False
+        ) as f:
+            tmp = f.name
+        df.to_feather(tmp)
+        os.replace(tmp, cached)
+    except (OSError, ValueError, TypeError, pyarrow.ArrowException):
+        # e.g. a read-only directory or an object column mixing numbers and strings
+        if tmp is not None:
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+    return df
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+
+def lttb(x, y, n_out):
+    """Returns the indices of the points kept by Largest-Triangle-Three-Buckets
+    The first and last points are kept, and in each bucket in between the point forming the
+    largest triangle with the previous kept point and the mean of the next bucket, which
+    preserves the peaks and the shape of the series.
+    Parameters:
+            x (array): x values, sorted
+            y (array): y values
+            n_out (int): number of points to keep, at least 3
+    Returns:
+            indices (np.ndarray): sorted indices of the kept points
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        raise ValueError(f"n_out must be at least 3, got {n_out}")
+
+    # n_out - 2 buckets between the first and the last point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    kept = np.empty(n_out, dtype=int)
+    kept[0] = 0
+    kept[-1] = n - 1
+    for i in range(n_out - 2):
+        (start, end) = (edges[i], edges[i + 1])
+        if i + 2 < len(edges):
+            (next_x, next_y) = (x[end : edges[i + 2]].mean(), y[end : edges[i + 2]].mean())
+        else:
+            (next_x, next_y) = (x[-1], y[-1])
+        a = kept[i]
+        areas = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        kept[i + 1] = start + np.argmax(areas)
+    return kept
+
+
+def downsample(input_df, input_x, input_y, max_points, input_col=None):
+    """Returns the rows of a dataframe at no more than max_points distinct x values
+    The x values are picked with LTTB on the total of y by x, and kept for every trace so that
+    stacked areas stay aligned.
+    Parameters:
+            input_df (pd.DataFrame): data of the chart, y already numeric
+            input_x (str): name of the field for the x axis
+            input_y (str): name of the field for the y axis
+            max_points (int): maximum number of points per trace, None keeps them all
+            input_col (str): name of the field for the traces, default is None
+    Returns:
+            output_df (pd.DataFrame): rows at the kept x values, in the input order
+    """
+    if max_points is None:
+        return input_df
+    totals = input_df.groupby(input_x)[input_y].sum().sort_index()
+    if len(totals) <= max_points:
+        return input_df
+    kept = totals.index[lttb(totals.index, totals.to_numpy(), max_points)]
+    return input_df.loc[input_df[input_x].isin(kept)]
+
+
+def top_n_others(input_df, input_x, input_y, input_col, top_n, others_label="Others"):
+    """Returns the data of the top_n traces by total, the other traces summed in a single one
+    Parameters:
+            input_df (pd.DataFrame): data of the chart, y already numeric
+            input_x (str): name of the field for the x axis
+            input_y (str): name of the field for the y axis
+            input_col (str): name of the field for the traces, e.g. countries
+            top_n (int): number of traces kept, None keeps them all
+            others_label (str): name of the trace of the others, default is 'Others'
+    Returns:
+            output_df (pd.DataFrame): rows of the top traces in the input order, then the
+                rows of the others by x
+    """
+    if top_n is None or input_df[input_col].nunique() <= top_n:
+        return input_df
+    totals = input_df.groupby(input_col)[input_y].sum()
+    top = totals.nlargest(top_n).index
+    is_top = input_df[input_col].isin(top)
+    others = input_df.loc[~is_top].groupby(input_x, as_index=False)[input_y].sum()
+    others[input_col] = others_label
+    return pd.concat([input_df.loc[is_top], others], ignore_index=True)
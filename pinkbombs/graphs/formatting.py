@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+
+def format_unique(values, formatter):
+    """Returns the values formatted as strings, calling the formatter once per distinct value
+    Parameters:
+            values (pd.Series or array): values to format
+            formatter (function): formats a single value
+    Returns:
+            output (pd.Series): formatted values, NaN where the value is missing
+    """
+    values = pd.Series(values)
+    codes, uniques = pd.factorize(values)
+    formatted = np.array([formatter(x) for x in uniques.tolist()] + [np.nan], dtype=object)
+    # Missing values have the code -1, which picks the trailing NaN
+    return pd.Series(formatted[codes], index=values.index)
+
+
+def format_number(values, decimals=0, prefix="", suffix="", grouping=True, width=0):
+    """Returns numbers as strings with thousands separators, e.g. 1562415 -> '1,562,415'
+    Parameters:
+            values (pd.Series or array): numbers to format
+            decimals (int): number of decimals, default is 0
+            prefix (str): text added before the numbers, default is empty
+            suffix (str): text added after the numbers (unit), default is empty
+            grouping (boolean): to add the thousands separators, default is True
+            width (int): minimum width, numbers are padded with spaces on the left
+    Returns:
+            output (pd.Series): formatted values, NaN where the value is missing
+    """
+    spec = "{:" + (str(width) if width else "") + ("," if grouping else "") + f".{decimals}f}}"
+    return prefix + format_unique(values, spec.format) + suffix
+
+
+def format_significant(values, suffix=""):
+    """Returns numbers as strings with only 3-4 significant figures, e.g. 0.1234 -> '0.12'
+    Parameters:
+            values (pd.Series or array): numbers to format
+            suffix (str): text added after the numbers (unit), default is empty
+    Returns:
+            output (pd.Series): formatted values, NaN where the value is missing
+    """
+
+    def formatter(x):
+        decimals = 0 if x >= 100 else 1 if x >= 10 else 2
+        return f"{x:,.{decimals}f}"
+
+    return format_unique(values, formatter) + suffix
+
+
+def format_currency(values, symbol="$", suffix=""):
+    """Returns amounts in millions or billions, e.g. 1420552446 -> '$1.4B'
+    Parameters:
+            values (pd.Series or array): amounts in units
+            symbol (str): currency symbol put before the amounts, default is '$'
+            suffix (str): text added after the amounts, default is empty
+    Returns:
+            output (pd.Series): formatted values, NaN where the value is missing
+    """
+    millions = pd.Series(values, dtype=float) / 1e6
+    billions = millions >= 1000
+    scaled = millions.where(~billions, millions / 1000)
+    output = format_number(scaled, decimals=1, grouping=False, prefix=symbol)
+    return output + np.where(billions, "B", "M") + suffix
+
+
+def format_range(low, high, formatter=format_significant, separator=" - ", suffix=""):
+    """Returns 2 columns of numbers as ranges, e.g. '1.2 - 3.4 GWh'
+    Parameters:
+            low (pd.Series): lower bounds
+            high (pd.Series): upper bounds
+            formatter (function): formatting function of this module, default is
+                format_significant
+            separator (str): text between the bounds, default is ' - '
+            suffix (str): text added after the ranges (unit), default is empty
+    Returns:
+            output (pd.Series): formatted ranges, a missing bound written 'nan' as python's
+                format does, e.g. '1.00 - nan GWh'
+    """
+    return formatter(low).fillna("nan") + separator + formatter(high).fillna("nan") + suffix
+
+
+def make_anchor(href, text):
+    """Returns html links opening in a new tab
+    Parameters:
+            href (pd.Series or str): urls of the links
+            text (pd.Series or str): text of the links
+    Returns:
+            output (pd.Series): html anchors
+    """
+    if not isinstance(href, str):
+        href = pd.Series(href).astype(str)
+    if not isinstance(text, str):
+        text = pd.Series(text).astype(str)
+    return '<a href="' + href + '" target="_blank" rel="noopener noreferrer">' + text + "</a>"
+
+
+def add_prefix(values, mask, prefix):
+    """Returns the values with a prefix where the mask is true, e.g. '~' for estimates"""
+    return values.where(~mask, prefix + values.astype(str))
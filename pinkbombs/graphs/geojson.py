@@ -0,0 +1,48 @@
+import numpy as np
+
+
+def points_to_geojson(input_df, input_x="Long", input_y="Lat", properties=None):
+    """Returns the rows of a dataframe as a GeoJSON FeatureCollection of points
+    The same as the __geo_interface__ of a GeoDataFrame made with points_from_xy, without
+    importing geopandas, shapely and pyproj for what is only a Lat/Long conversion.
+    Parameters:
+            input_df (pd.DataFrame): data of the features
+            input_x (str): name of the field with the longitudes, default is 'Long'
+            input_y (str): name of the field with the latitudes, default is 'Lat'
+            properties (list(str)): fields kept as properties, default is None for all of them
+    Returns:
+            geojson (dict): FeatureCollection with the ids, properties and bounding boxes,
+                missing values as None
+    """
+    x = input_df[input_x].to_numpy(dtype=float).tolist()
+    y = input_df[input_y].to_numpy(dtype=float).tolist()
+    values = input_df if properties is None else input_df[properties]
+    properties = values.astype(object).where(values.notna(), None).to_dict("records")
+    features = [
+        {
+            "id": str(id),
+            "type": "Feature",
+            "properties": props,
+            "geometry": {"type": "Point", "coordinates": (xi, yi)},
+            "bbox": (xi, yi, xi, yi),
+        }
+        for (id, props, xi, yi) in zip(input_df.index, properties, x, y)
+    ]
+    bbox = (np.min(x), np.min(y), np.max(x), np.max(y)) if features else (np.nan,) * 4
+    return {"type": "FeatureCollection", "features": features, "bbox": bbox}
+
+
+def to_geojson(input_df, input_x="Long", input_y="Lat"):
+    """Returns a dataframe as a GeoJSON FeatureCollection
+    A GeoDataFrame keeps its real geometries through geopandas, a plain dataframe is converted
+    to points with points_to_geojson.
+    Parameters:
+            input_df (pd.DataFrame or gpd.GeoDataFrame): data to convert
+            input_x (str): name of the field with the longitudes, default is 'Long'
+            input_y (str): name of the field with the latitudes, default is 'Lat'
+    Returns:
+            geojson (dict): FeatureCollection
+    """
+    if hasattr(input_df, "__geo_interface__"):
+        return input_df.__geo_interface__
+    return points_to_geojson(input_df, input_x, input_y)
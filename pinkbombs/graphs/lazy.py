@@ -0,0 +1,49 @@
+import ast
+import importlib
+import importlib.util
+
+
+class LazyFunction:
+    """Function of the graphs package imported on its first call, so that the registries do not
+    import plotly, geopandas or folium until a job actually needs them
+    Parameters:
+            path (str): module and name of the function in the graphs package, e.g.
+                'viz.make_area_single_chart'
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.module_name, self.name = path.rsplit(".", 1)
+        self._function = None
+
+    def resolve(self):
+        """Returns the function, importing its module the first time"""
+        if self._function is None:
+            module = importlib.import_module("." + self.module_name, package=__package__)
+            self._function = getattr(module, self.name)
+        return self._function
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def source(self):
+        """Returns the source code of the function, read from its file without importing it"""
+        spec = importlib.util.find_spec("." + self.module_name, package=__package__)
+        with open(spec.origin, encoding="utf-8") as f:
+            code = f.read()
+        for node in ast.parse(code).body:
+            if isinstance(node, ast.FunctionDef) and node.name == self.name:
+                return ast.get_source_segment(code, node)
+        raise AttributeError(f"{self.name} not found in {spec.origin}")
+
+    def __repr__(self):
+        return f"lazy({self.path!r})"
+
+    def __reduce__(self):
+        # Pickled by path, e.g. to be sent to the worker processes of the build
+        return (LazyFunction, (self.path,))
+
+
+def lazy(path):
+    """Returns a LazyFunction of the graphs package, e.g. lazy('viz.make_bar_chart')"""
+    return LazyFunction(path)
@@ -1,10 +1,36 @@
+import contextlib
+import glob
+import hashlib
+import json
+import os
 import numpy as np
-import geopandas as gpd
 import folium
 from folium.plugins import GroupedLayerControl
 from branca.element import Template, MacroElement
 import plotly.express as px
 from plotly.graph_objects import Figure
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+from .formatting import format_number, format_range, make_anchor
+from .geojson import to_geojson
+
+
+def get_plotlyjs_filename():
+    """Returns the name of the versioned plotly.js bundle shared by the maps"""
+    return f"plotly-{get_plotlyjs_version()}.min.js"
+
+
+def write_plotlyjs(directory):
+    """Writes the shared plotly.js bundle in directory if it is not there yet
+    Parameters:
+            directory (str): directory of the maps, the bundle sits next to the language folders
+    Returns:
+            path (str): path of the bundle
+    """
+    path = os.path.join(directory, get_plotlyjs_filename())
+    if not os.path.exists(path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(get_plotlyjs())
+    return path
 
 
 def make_animated_bubble_map(
@@ -20,6 +46,9 @@ def make_animated_bubble_map(
     palette=px.colors.qualitative.Prism,
     theme="simple_white",
     reverse=False,
+    include_plotlyjs=True,
+    full_html=True,
+    compact=False,
 ) -> str:
     """Returns plotly express object as Bubbles map with animation
     Parameters:
@@ -34,6 +63,13 @@ def make_animated_bubble_map(
             palette (px.object): plotly discrete palette, default is Prism
             theme (str): plotly chart theme, default is 'simple_white'
             last_frame (boolean): to add last frame as first
+            include_plotlyjs (boolean or str): how plotly.js is loaded, see plotly's to_html.
+                'shared' references the versioned bundle written by write_plotlyjs one folder
+                up, True inlines the whole bundle. Default is True.
+            full_html (boolean): False returns only the div, to embed in an existing page.
+                Default is True.
+            compact (boolean): True writes the locations and names once, and only the sizes in
+                the frames, see compact_animation. Default is False.
     Returns:
             area (html): output chart object as html string.
     """
@@ -85,18 +121,75 @@ def make_animated_bubble_map(
     #    yaxis=dict(scaleanchor='x', scaleratio=1)
     #    )
 
-    if last_frame:
-        map2 = Figure()
-        for tr in map.frames[-1].data:
-            map2.add_trace(tr)
-        map2.layout = map.layout
-        map2.frames = map.frames
-        map2.layout["sliders"][0]["active"] = len(map.frames) - 1
+    active = len(map.frames) - 1 if last_frame else 0
+    if compact:
+        map2 = compact_animation(
+            map, input_df, input_loc, input_hover, input_time, input_size, active
+        )
+    else:
+        map2 = Figure(data=map.frames[active].data, layout=map.layout, frames=map.frames)
+    map2.layout["sliders"][0]["active"] = active
 
     # Remove lasso and select + drag zoom
     map2.update_layout(modebar_remove=["lasso2d", "select2d"], dragmode=False)
 
-    return map2.to_html(auto_play=False)
+    if include_plotlyjs == "shared":
+        include_plotlyjs = "../" + get_plotlyjs_filename()
+
+    return map2.to_html(auto_play=False, include_plotlyjs=include_plotlyjs, full_html=full_html)
+
+
+def compact_animation(fig, input_df, input_loc, input_hover, input_time, input_size, active=0):
+    """Returns an animated bubble map whose frames only carry the sizes of the bubbles
+    plotly express repeats the locations, names and hover data of every bubble in every frame.
+    Here the single trace has every location of the animation once, and each frame is one row
+    of the time x location matrix of the sizes (0 when a location has no data that year),
+    which plotly.js merges into the trace when it plays the frame.
+    Parameters:
+            fig (Figure): animated map of px.scatter_geo, with a single trace per frame
+            input_df (pd.DataFrame): data of the map
+            input_loc (str): name of the field with the iso alpha3 codes
+            input_hover (str): name of the field to show on hover, one per location
+            input_time (str): name of the time field of the animation
+            input_size (str): name of the field for the size of the bubbles
+            active (int): index of the frame shown first, default is 0
+    Returns:
+            compact (Figure): figure with the layout of fig and the compact frames
+    """
+    locations = input_df.groupby(input_hover, sort=False)[input_loc].first()
+    sizes = input_df.pivot_table(
+        index=input_time, columns=input_hover, values=input_size, aggfunc="sum", fill_value=0
+    ).reindex(columns=locations.index, fill_value=0)
+    sizes.index = sizes.index.astype(str)
+
+    def hovertemplate(time):
+        return (
+            f"<b>%{{hovertext}}</b><br><br>{input_time}={time}<br>"
+            f"{input_size}=%{{marker.size:,.0f}}<extra></extra>"
+        )
+
+    frames = [
+        {
+            "name": frame.name,
+            "data": [
+                {
+                    "type": "scattergeo",
+                    "marker": {"size": sizes.loc[frame.name].to_numpy()},
+                    "hovertemplate": hovertemplate(frame.name),
+                }
+            ],
+            "traces": [0],
+        }
+        for frame in fig.frames
+    ]
+    trace = fig.frames[active].data[0].update(
+        locations=locations.to_numpy(),
+        hovertext=locations.index.to_numpy(),
+        customdata=None,
+        hovertemplate=frames[active]["data"][0]["hovertemplate"],
+        marker_size=frames[active]["data"][0]["marker"]["size"],
+    )
+    return Figure(data=[trace], layout=fig.layout, frames=frames)
 
 
 def get_transfo_param(df, col, min_rad=2.5, max_rad=60):
@@ -116,29 +209,48 @@ def get_transfo_param(df, col, min_rad=2.5, max_rad=60):
     return (slope, intercept)
 
 
-def make_geojson_layer(temp_geojson0, fields, aliases, mylistcol, modality, a, b):
-    """Returns a folium layer with bubbles of size defined by a linear equation and pop-ups
+def add_bubble_style(input_df, modality, mylistcol, a, b, name):
+    """Returns the dataframe with the radius and color of the bubbles of a layer as fields,
+    so that they are computed once for all the farms instead of in the style of each feature
     Parameters:
-            temp_geojson0 (GeoJson DataFrame): Dataframe containing data to display
-            fields (list(str)): List of fields to be shown on pop-ups
-            aliases (list(str)): List of aliases to show the fields on pop-ups
-            mylistcol (list(str)): List of colorcodes to use for the bubbles
+            input_df (DataFrame): Dataframe containing data to display
             modality (str): Name of field used to determine size of bubbles
+            mylistcol (list(str)): List of colorcodes to use for the bubbles, by Status_col
             a (float): Parameter for the slope of the linear transformation
             b (float): Parameter for the intercept of the linear transformation
+            name (str): Suffix of the new fields, 'radius_<name>' and 'color_<name>'
+    Returns:
+            input_df (DataFrame): New dataframe with the 2 additional fields
+    """
+    return input_df.assign(
+        **{
+            "radius_" + name: (input_df[modality] * a + b).round(2),
+            "color_" + name: np.array(mylistcol)[input_df["Status_col"].to_numpy()],
+        }
+    )
+
+
+def make_geojson_layer(geojson, fields, aliases, radius_field, color_field):
+    """Returns a folium layer with all the bubbles and pop-ups of a modality
+    Parameters:
+            geojson (dict): FeatureCollection of all the farms to display
+            fields (list(str)): List of fields to be shown on pop-ups
+            aliases (list(str)): List of aliases to show the fields on pop-ups
+            radius_field (str): Name of the property with the radius of the bubbles
+            color_field (str): Name of the property with the color of the bubbles
     Returns:
             layer (folium object): Folium layer with bubbles and pop-ups settings
     """
     layer = folium.GeoJson(
-        temp_geojson0,
+        geojson,
         control=False,
         marker=folium.CircleMarker(
             radius=1, weight=2, color="black", fill_color="#000000", fill_opacity=0.6, opacity=0.8
         ),
         style_function=lambda x: {
-            "fillColor": mylistcol[x["properties"]["Status_col"]],
-            "color": mylistcol[x["properties"]["Status_col"]],
-            "radius": (x["properties"][modality] * a + b),
+            "fillColor": x["properties"][color_field],
+            "color": x["properties"][color_field],
+            "radius": x["properties"][radius_field],
             "fillOpacity": 0.6,
         },
         popup=folium.GeoJsonPopup(
@@ -153,24 +265,353 @@ def make_geojson_layer(temp_geojson0, fields, aliases, mylistcol, modality, a, b
     return layer
 
 
-def keep_4_figures(input):
-    """Returns the number as string with only 3-4 significant figures"""
-    if input >= 100:
-        output = "{:,.0f}".format(input)
-    elif input >= 10:
-        output = "{:,.1f}".format(input)
-    else:
-        output = "{:,.2f}".format(input)
-    return output
+# Fields of the farms shipped to the browser when the pop-ups are formatted there
+FARM_COLUMNS = [
+    "Parent company",
+    "Technologie",
+    "Species",
+    "Country",
+    "Location",
+    "Location source",
+    "Status",
+    "Detailed status",
+    "Production Max",
+    "Latest update",
+    "Link info (no text)",
+    "Carbon intensity of electricity - gCO2/kWh",
+    "elec_conso_kWh_low",
+    "elec_conso_kWh_high",
+    "carbon_kt_low",
+    "carbon_kt_high",
+    "Lat",
+    "Long",
+]
+
+
+class FarmData(MacroElement):
+    """The farms of the RAS map written once in the page as columns and rows, with a single
+    pop-up template, shared by the layers and formatted in the browser when a farm is clicked.
+    The formatting follows create_elements_popups.
+    With a data_url, the farms and their clusters are fetched from the file written by
+    write_farms_data once the base map is shown, and the layers are drawn when it arrives.
+    Parameters:
+            input_df (DataFrame): farms, with the FARM_COLUMNS
+            aliases (list(str)): labels of the pop-up rows, in the order of define_fields
+            statuses (list(str)): the Operating and In construction statuses, in the language
+                of the data
+            levels (list(dict)): clusters of the farms by zoom, from grid_clusters. Default is
+                None, which never groups them.
+            cluster_label (str): text after the number of farms of a cluster, default is 'farms'
+            data_url (str): url of the data of the farms, relative to the page. Default is
+                None, which writes them in the page.
+    """
+
+    _template = Template(
+        r"""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = {{ this.data|tojson }};
+        {{ this.get_name() }}.callbacks = [];
+        {{ this.get_name() }}.whenReady = function (callback) {
+            if ({{ this.get_name() }}.rows) {
+                callback();
+            } else {
+                {{ this.get_name() }}.callbacks.push(callback);
+            }
+        };
+        {% if this.data_url %}
+        fetch({{ this.data_url|tojson }}).then(function (response) {
+            return response.json();
+        }).then(function (data) {
+            var farms = {{ this.get_name() }};
+            farms.levels = data.levels;
+            farms.rows = data.rows;
+            farms.callbacks.forEach(function (callback) { callback(); });
+        });
+        {% endif %}
+        {{ this.get_name() }}.popup = function (row) {
+            var f = {};
+            {{ this.get_name() }}.columns.forEach(function (column, i) { f[column] = row[i]; });
+            // toFixed rounds the exact binary value of x like python's format, but it rounds
+            // the exact ties away from zero where python rounds them to the even digit, e.g.
+            // 0.125 is "0.13" with toFixed and "0.12" with python
+            function fixed(x, decimals, grouping) {
+                if (x === null) {
+                    return "nan";
+                }
+                var text = x.toFixed(decimals);
+                var exact = Math.abs(x).toFixed(100);
+                var point = exact.indexOf(".");
+                if (point >= 0 && /^50*$/.test(exact.slice(point + 1 + decimals))) {
+                    var kept = exact.slice(0, decimals ? point + 1 + decimals : point);
+                    if ("02468".includes(kept[kept.length - 1])) {
+                        text = (x < 0 ? "-" : "") + kept;
+                    }
+                }
+                var parts = text.split(".");
+                if (grouping) {
+                    parts[0] = parts[0].replace(/\B(?=(\d{3})+(?!\d))/g, ",");
+                }
+                return parts.join(".");
+            }
+            function significant(x) {
+                return fixed(x, x >= 100 ? 0 : x >= 10 ? 1 : 2, true);
+            }
+            function scaled(x, scale) {
+                return x === null ? null : x / scale;
+            }
+            // The fields of the csv are written in the html of the pop-up as text
+            function escape(text) {
+                return String(text === null ? "nan" : text).replace(/[&<>"']/g, function (c) {
+                    return {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;"}[c];
+                });
+            }
+            function anchor(href, text) {
+                return '<a href="' + escape(href) + '" target="_blank" rel="noopener noreferrer">'
+                    + text + "</a>";
+            }
+            var statuses = {{ this.get_name() }}.statuses;
+            var intensity = fixed(f["Carbon intensity of electricity - gCO2/kWh"], 0, false)
+                + " gCO2/kWh (" + escape(f["Country"]) + ")";
+            var values = [
+                escape(f["Parent company"]),
+                escape(f["Technologie"]),
+                escape(f["Species"]),
+                escape(f["Country"]),
+                anchor(f["Location source"], escape(f["Location"])),
+                escape(f["Status"] + (statuses.includes(f["Detailed status"]) ? "" :
+                    " (" + f["Detailed status"] + ")")),
+                fixed(f["Production Max"] === null ? null : Math.trunc(f["Production Max"]), 0,
+                    true) + " tonnes",
+                anchor(f["Link info (no text)"], fixed(f["Latest update"], 0, false)),
+                significant(scaled(f["elec_conso_kWh_low"], 1e6)) + " - "
+                    + significant(scaled(f["elec_conso_kWh_high"], 1e6)) + " GWh",
+                anchor("https://ourworldindata.org/grapher/carbon-intensity-electricity",
+                    intensity),
+                significant(f["carbon_kt_low"]) + " - " + significant(f["carbon_kt_high"])
+                    + " kilo tonnes C02",
+            ];
+            var html = '<table style="background-color: #F0EFEF; border-radius: 3px;">';
+            {{ this.get_name() }}.aliases.forEach(function (alias, i) {
+                html += "<tr><th>" + alias + "</th><td>" + values[i] + "</td></tr>";
+            });
+            return html + "</table>";
+        };
+        {% endmacro %}
+        """
+    )
+
+    def __init__(
+        self, input_df, aliases, statuses, levels=None, cluster_label="farms", data_url=None
+    ):
+        super().__init__()
+        self._name = "FarmData"
+        self.data_url = data_url
+        self.data = {
+            "columns": FARM_COLUMNS,
+            "aliases": aliases,
+            "statuses": statuses,
+            "clusterLabel": cluster_label,
+        }
+        if data_url is None:
+            self.data["rows"] = farm_rows(input_df)
+            self.data["levels"] = levels or []
+
+
+class FarmLayer(MacroElement):
+    """Bubbles of a modality of the RAS map, added to the parent layer from the rows of a
+    FarmData, the pop-ups being formatted on click
+    At the zooms where the FarmData has clusters, the farms of a cluster are drawn as a single
+    bubble of their summed modality, capped at max_radius, which zooms in when clicked. The
+    bubbles are drawn again at each zoom.
+    Parameters:
+            farms (FarmData): farms of the map
+            low (str): name of the field with the lower bound of the modality
+            high (str): name of the field with the upper bound of the modality
+            scale (float): divisor of the bounds, e.g. 1e6 for kWh to GWh
+            colors (list(str)): colors of the bubbles by status, see define_colors
+            a (float): slope of the radius, from get_transfo_param on the mid points
+            b (float): intercept of the radius
+            max_radius (float): radius of the largest clusters, default is 60
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+        (function (farms, group, map) {
+            var column = {};
+            farms.columns.forEach(function (name, i) { column[name] = i; });
+            var colors = {{ this.colors|tojson }};
+            function mid(row) {
+                var low = row[column[{{ this.low|tojson }}]];
+                var high = row[column[{{ this.high|tojson }}]];
+                return low === null || high === null ? null : (low + high) / 2 / {{ this.scale }};
+            }
+            function statusIndex(row) {
+                var status = row[column["Status"]];
+                return status === farms.statuses[0] ? 0 : status === farms.statuses[1] ? 1 : 2;
+            }
+            function bubble(latlng, value, status, maxRadius) {
+                var radius = Math.round(({{ this.a }} * value + {{ this.b }}) * 100) / 100;
+                var color = colors[status];
+                return L.circleMarker(latlng, {
+                    radius: Math.min(radius, maxRadius),
+                    weight: 2,
+                    color: color,
+                    fillColor: color,
+                    fillOpacity: 0.6,
+                    opacity: 0.8,
+                });
+            }
+            function drawFarm(row) {
+                var value = mid(row);
+                if (value === null) {
+                    return;
+                }
+                var latlng = [row[column["Lat"]], row[column["Long"]]];
+                bubble(latlng, value, statusIndex(row), Infinity)
+                    .bindPopup(function () {
+                        return farms.popup(row);
+                    }, {maxWidth: 800}).addTo(group);
+            }
+            function draw() {
+                group.clearLayers();
+                var zoom = map.getZoom();
+                var level = farms.levels.find(function (level) { return level.zoom === zoom; });
+                if (level === undefined) {
+                    farms.rows.forEach(drawFarm);
+                    return;
+                }
+                var clusters = level.centers.map(function () {
+                    return {rows: [], value: 0, status: 2};
+                });
+                farms.rows.forEach(function (row, i) {
+                    var value = mid(row);
+                    if (value !== null) {
+                        var cluster = clusters[level.cells[i]];
+                        cluster.rows.push(row);
+                        cluster.value += value;
+                        cluster.status = Math.min(cluster.status, statusIndex(row));
+                    }
+                });
+                clusters.forEach(function (cluster, i) {
+                    if (cluster.rows.length === 1) {
+                        drawFarm(cluster.rows[0]);
+                    } else if (cluster.rows.length > 1) {
+                        var center = level.centers[i];
+                        bubble(center, cluster.value, cluster.status, {{ this.max_radius }})
+                            .bindTooltip(cluster.rows.length + " " + farms.clusterLabel)
+                            .on("click", function () { map.setView(center, zoom + 1); })
+                            .addTo(group);
+                    }
+                });
+            }
+            farms.whenReady(function () {
+                map.on("zoomend", draw);
+                draw();
+            });
+        })(
+            {{ this.farms.get_name() }},
+            {{ this._parent.get_name() }},
+            {{ this._parent._parent.get_name() }}
+        );
+        {% endmacro %}
+        """
+    )
+
+    def __init__(self, farms, low, high, scale, colors, a, b, max_radius=60):
+        super().__init__()
+        self._name = "FarmLayer"
+        self.farms = farms
+        self.low = low
+        self.high = high
+        self.scale = scale
+        self.colors = colors
+        self.a = a
+        self.b = b
+        self.max_radius = max_radius
+
+
+def farm_rows(input_df):
+    """Returns the FARM_COLUMNS of the farms as rows of raw values, missing values as None"""
+    rows = input_df[FARM_COLUMNS].astype(object)
+    return rows.where(rows.notna(), None).to_numpy().tolist()
+
+
+def write_farms_data(input_df, levels, directory):
+    """Writes the rows of the farms of the RAS map and their clusters as a json named after its
+    content, if it is not there yet, so that it is cached apart from the page and a new version
+    gets a new url. The older versions of the directory are removed.
+    Parameters:
+            input_df (DataFrame): farms, with the FARM_COLUMNS
+            levels (list(dict)): clusters of the farms by zoom, from grid_clusters
+            directory (str): directory of the map
+    Returns:
+            filename (str): name of the file in directory, e.g. 'farms-<hash>.json'
+    """
+    data = {"rows": farm_rows(input_df), "levels": levels}
+    content = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    filename = f"farms-{hashlib.sha256(content.encode()).hexdigest()[:12]}.json"
+    path = os.path.join(directory, filename)
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        # Written aside then moved, as several build processes can write the same file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    for old in glob.glob(os.path.join(directory, "farms-*.json")):
+        if os.path.basename(old) != filename:
+            with contextlib.suppress(FileNotFoundError):  # removed by a concurrent build
+                os.remove(old)
+    return filename
+
+
+def grid_clusters(lat, lng, cell_px=60, min_zoom=2, max_zoom=12):
+    """Returns the points grouped by the square cells of cell_px pixels they fall in, at each
+    zoom of the map from min_zoom until the zoom where no cell has more than one point
+    Parameters:
+            lat (array): latitudes of the points
+            lng (array): longitudes of the points
+            cell_px (int): width of the cells in screen pixels, default is 60
+            min_zoom (int): first zoom of the map, default is 2
+            max_zoom (int): maximum zoom of the map, default is 12
+    Returns:
+            levels (list(dict)): for each zoom with clusters, the 'zoom', the index of the
+                cluster of each point ('cells') and the mean [lat, lng] of each cluster
+                ('centers')
+    """
+    lat = np.asarray(lat, dtype=float)
+    lng = np.asarray(lng, dtype=float)
+    # Web mercator position in the world, which is 256 * 2**zoom pixels wide
+    x = (lng + 180) / 360
+    sin = np.sin(np.radians(lat))
+    y = 0.5 - np.log((1 + sin) / (1 - sin)) / (4 * np.pi)
+
+    levels = []
+    for zoom in range(min_zoom, max_zoom):
+        cells_per_side = 256 * 2**zoom / cell_px
+        cell = np.floor(x * cells_per_side) * np.ceil(cells_per_side) + np.floor(
+            y * cells_per_side
+        )
+        (_, cells, counts) = np.unique(cell, return_inverse=True, return_counts=True)
+        if len(counts) == 0 or counts.max() == 1:
+            break
+        centers = np.column_stack(
+            [np.bincount(cells, weights=lat) / counts, np.bincount(cells, weights=lng) / counts]
+        )
+        levels.append(
+            {"zoom": zoom, "cells": cells.tolist(), "centers": np.round(centers, 5).tolist()}
+        )
+    return levels
 
 
 def create_elements_popups(input_df, french=False):
     """Returns the dataframe with all the fields necessary to make the pop-ups on the map
     Parameters:
-            input_df (Geopandas DataFrame): Dataframe containing data to display
+            input_df (DataFrame): Dataframe containing data to display
             french (boolean): Decide if aliases are in french. Default is False.
     Returns:
-            input_df (Geopandas DataFrame): Dataframe with additionnal fields for the pop-ups
+            input_df (DataFrame): New dataframe with additionnal fields for the pop-ups
     """
 
     if french:
@@ -180,70 +621,70 @@ def create_elements_popups(input_df, french=False):
         status1="Operating"
         status2="In construction"
 
+    # The new fields are computed aside and added at once, input_df is left as it is
+    fields = {}
+
     # Simplify elec conso and calculate mid points
-    input_df["elec_conso_GWh_low"] = input_df["elec_conso_kWh_low"] / 1e6
-    input_df["elec_conso_GWh_high"] = input_df["elec_conso_kWh_high"] / 1e6
-    input_df["elec_conso_GWh_mid"] = (
-        input_df["elec_conso_GWh_high"] + input_df["elec_conso_GWh_low"]
-    ) / 2
-    input_df["carbon_kt_mid"] = (input_df["carbon_kt_high"] + input_df["carbon_kt_low"]) / 2
+    elec_low = input_df["elec_conso_kWh_low"] / 1e6
+    elec_high = input_df["elec_conso_kWh_high"] / 1e6
+    fields["elec_conso_GWh_low"] = elec_low
+    fields["elec_conso_GWh_high"] = elec_high
+    fields["elec_conso_GWh_mid"] = (elec_high + elec_low) / 2
+    fields["carbon_kt_mid"] = (input_df["carbon_kt_high"] + input_df["carbon_kt_low"]) / 2
 
     # Create strings to display on box
-    input_df["Production Capacity (annual)"] = (
-        input_df["Production Max"].apply(lambda x: format(int(x), "8,d")) + " tonnes"
+    fields["Production Capacity (annual)"] = format_number(
+        np.trunc(input_df["Production Max"]), width=8, suffix=" tonnes"
     )
-    input_df["Electricity consumption (annual)"] = (
-        input_df["elec_conso_GWh_low"].apply(lambda x: keep_4_figures(x))
-        + " - "
-        + input_df["elec_conso_GWh_high"].apply(lambda x: keep_4_figures(x))
-        + " GWh"
+    fields["Electricity consumption (annual)"] = format_range(
+        elec_low, elec_high, suffix=" GWh"
     )
-    input_df["Carbon Footprint (annual)"] = (
-        input_df["carbon_kt_low"].apply(lambda x: keep_4_figures(x))
-        + " - "
-        + input_df["carbon_kt_high"].apply(lambda x: keep_4_figures(x))
-        + " kilo tonnes C02"
+    fields["Carbon Footprint (annual)"] = format_range(
+        input_df["carbon_kt_low"], input_df["carbon_kt_high"], suffix=" kilo tonnes C02"
     )
-    input_df["Country carbon intensity of electricity"] = (
-        input_df["Carbon intensity of electricity - gCO2/kWh"].apply(lambda x: format(x, ".0f"))
-        + " gCO2/kWh"
-        + input_df["Country"].apply(lambda x: " (" + x + ")")
+    carbon_intensity = (
+        format_number(input_df["Carbon intensity of electricity - gCO2/kWh"], grouping=False)
+        .fillna("nan")
+        + " gCO2/kWh ("
+        + input_df["Country"]
+        + ")"
     )
+    fields["Country carbon intensity of electricity"] = carbon_intensity
 
     # Create a field to combine Status and Detailed Status
-    input_df["Detailed status ()"] = np.where(
+    detailed_status = np.where(
         input_df["Detailed status"].isin([status1, status2]),
         "",
-        input_df["Detailed status"].apply(lambda x: " (" + x + ")"),
+        " (" + input_df["Detailed status"] + ")",
     )
-    input_df["Status2"] = input_df["Status"] + input_df["Detailed status ()"]
+    fields["Detailed status ()"] = detailed_status
+    fields["Status2"] = input_df["Status"] + detailed_status
 
     # Create hyperlink for Location
-    input_df["Location source link2"] = input_df["Location source"].apply(
-        lambda x: f'<a href="{x}" target="_blank" rel="noopener noreferrer">'
-    ) + input_df["Location"].apply(lambda x: f'{str(x)}</a>')
+    fields["Location source link2"] = make_anchor(
+        input_df["Location source"], input_df["Location"]
+    )
 
     # Create hyperlink for info/latest update
-    input_df["Latest update2"] = input_df["Link info (no text)"].apply(
-        lambda x: f'<a href="{x}" target="_blank" rel="noopener noreferrer">'
-    ) + input_df["Latest update"].apply(
-        lambda x: f'NAN</a>' if np.isnan(x) else f'{str(int(x))}</a>'
+    fields["Latest update2"] = make_anchor(
+        input_df["Link info (no text)"],
+        format_number(input_df["Latest update"], grouping=False).fillna("NAN"),
     )
 
     # Create hyperlink for the Carbon Electricity by country
     carbon_intensity_link = "https://ourworldindata.org/grapher/carbon-intensity-electricity"
-    input_df["Country carbon intensity of electricity link"] = input_df[
-        "Country carbon intensity of electricity"
-    ].apply(lambda x: f'<a href="{carbon_intensity_link}" target="_blank" rel="noopener noreferrer">{x}</a>')
+    fields["Country carbon intensity of electricity link"] = make_anchor(
+        carbon_intensity_link, carbon_intensity
+    )
 
     # Define colors indeces
-    input_df["Status_col"] = np.where(
+    fields["Status_col"] = np.where(
         input_df["Status"] == status1,
         0,
         np.where(input_df["Status"] == status2, 1, 2),
     )
 
-    return input_df
+    return input_df.assign(**fields)
 
 
 def define_fields(french=False):
@@ -478,7 +919,10 @@ def make_ras_bubble_map(
         legend_title,
         title,
         add_title_legend=False, 
-        french=False
+        french=False,
+        client_popups=False,
+        cluster_px=None,
+        data_dir=None,
         ):
     """Returns a folium map object with the RAS farms as bubble and pop-ups
     Parameters:
@@ -489,18 +933,37 @@ def make_ras_bubble_map(
             title (str): title for the map
             add_title_legend (boolean): turn true to add title and legend default is False
             french (boolean): Decide if aliases are in french. Default is False.
+            client_popups (boolean): True writes the fields of the farms once and formats the
+                pop-ups in the browser, see FarmData, instead of a geojson with the html of
+                every pop-up in each layer. Default is False.
+            cluster_px (int): with client_popups, groups the farms by cells of this size in
+                pixels at the low zooms, see grid_clusters. Default is None, no grouping.
+            data_dir (str): with client_popups, writes the farms in a json file of this directory,
+                see write_farms_data, which the page fetches after the base map is shown.
+                Default is None, which writes them in the page.
     Returns:
             map (folium object): Map with all elements
     """
 
-    # Remove the 4 ambitions lines and convert to Geopandas
+    # Remove the 4 ambitions lines
     input_df = input_df.loc[~input_df["Lat"].isna(),]
-    input_gdf = gpd.GeoDataFrame(
-        input_df, geometry=gpd.points_from_xy(input_df["Long"], input_df["Lat"]), crs="EPSG:4326"
-    )
+    if client_popups:
+        return make_client_popups_map(
+            input_df,
+            title_layer1,
+            title_layer2,
+            legend_title,
+            title,
+            add_title_legend,
+            french,
+            cluster_px,
+            data_dir,
+        )
+    if cluster_px is not None or data_dir is not None:
+        raise ValueError("cluster_px and data_dir need client_popups=True")
 
     # Create pop-ups
-    input_gdf = create_elements_popups(input_gdf, french=french)
+    input_gdf = create_elements_popups(input_df, french=french)
 
     # Determine transformation for display on the map - ELEC, CARBON
     (a_carbon, b_carbon) = get_transfo_param(input_gdf, "carbon_kt_mid", min_rad=3, max_rad=50)
@@ -514,31 +977,38 @@ def make_ras_bubble_map(
     hg1 = folium.FeatureGroup(name=title_layer1)
     hg2 = folium.FeatureGroup(name=title_layer2)
 
+    map = make_base_map()
+
+    # Radius and color of the bubbles of the 2 modalities - Electricity / Carbon
+    input_gdf = add_bubble_style(
+        input_gdf, "elec_conso_GWh_mid", shades_salmon, a_elec, b_elec, "elec"
+    )
+    input_gdf = add_bubble_style(
+        input_gdf, "carbon_kt_mid", shades_brown, a_carbon, b_carbon, "carbon"
+    )
+
+    # Serialise all the farms once, with one layer per modality
+    geojson = to_geojson(input_gdf, "Long", "Lat")
+    make_geojson_layer(geojson, fields, aliases, "radius_elec", "color_elec").add_to(hg1)
+    make_geojson_layer(geojson, fields, aliases, "radius_carbon", "color_carbon").add_to(hg2)
+
+    return finish_ras_map(map, hg1, hg2, legend_title, title, add_title_legend, french)
+
+
+def make_base_map():
+    """Returns the folium map of the RAS farms, without the layers"""
     # Map centered on World - limit max zoom to avoid too much scrutiny
-    map = folium.Map(
+    return folium.Map(
         location=(0, 0), maxZoom=12, minZoom=2,
         zoom_start=2, zoom_control=True, tiles="cartodb positron"
     )
 
-    ## Apply to the 2 modalities - Electricity / Carbon
-    for i in range(len(input_gdf.__geo_interface__["features"])):
-        temp_geojson = {
-            "features": [input_gdf.__geo_interface__["features"][i]],
-            "type": "FeatureCollection",
-        }
-
-        # Elec
-        temp_geojson_layer = make_geojson_layer(
-            temp_geojson, fields, aliases, shades_salmon, "elec_conso_GWh_mid", a_elec, b_elec
-        )
-        temp_geojson_layer.add_to(hg1)
-
-        # Carbon
-        temp_geojson_layer = make_geojson_layer(
-            temp_geojson, fields, aliases, shades_brown, "carbon_kt_mid", a_carbon, b_carbon
-        )
-        temp_geojson_layer.add_to(hg2)
 
+def finish_ras_map(map, hg1, hg2, legend_title, title, add_title_legend, french):
+    """Adds the 2 layers with their control, the title and the legend to the RAS map
+    Returns:
+            html (str): the rendered map
+    """
     hg1.add_to(map)
     hg2.add_to(map)
     GroupedLayerControl(
@@ -560,3 +1030,73 @@ def make_ras_bubble_map(
         map.get_root().add_child(macro)
 
     return map.get_root().render()
+
+
+def make_client_popups_map(
+    input_df,
+    title_layer1,
+    title_layer2,
+    legend_title,
+    title,
+    add_title_legend,
+    french,
+    cluster_px=None,
+    data_dir=None,
+):
+    """Returns the RAS map with the farms written once and the pop-ups formatted in the browser,
+    see make_ras_bubble_map for the parameters
+    """
+    (_, aliases) = define_fields(french=french)
+    (shades_salmon, shades_brown) = define_colors()
+    if french:
+        statuses = ["En fonctionnement", "En construction"]
+        cluster_label = "fermes-usines"
+    else:
+        statuses = ["Operating", "In construction"]
+        cluster_label = "farms"
+
+    # Radius of the bubbles from the mid points, as in make_ras_bubble_map
+    elec_mid = (input_df["elec_conso_kWh_low"] + input_df["elec_conso_kWh_high"]) / 2 / 1e6
+    carbon_mid = (input_df["carbon_kt_low"] + input_df["carbon_kt_high"]) / 2
+    mids = input_df.assign(elec_mid=elec_mid, carbon_mid=carbon_mid)
+    (a_elec, b_elec) = get_transfo_param(mids, "elec_mid", min_rad=3, max_rad=40)
+    (a_carbon, b_carbon) = get_transfo_param(mids, "carbon_mid", min_rad=3, max_rad=50)
+
+    map = make_base_map()
+    levels = None
+    if cluster_px is not None:
+        levels = grid_clusters(input_df["Lat"], input_df["Long"], cluster_px)
+    data_url = None
+    if data_dir is not None:
+        data_url = write_farms_data(input_df, levels or [], data_dir)
+    farms = FarmData(input_df, aliases, statuses, levels, cluster_label, data_url)
+    map.add_child(farms)
+
+    hg1 = folium.FeatureGroup(name=title_layer1)
+    hg2 = folium.FeatureGroup(name=title_layer2)
+    # The clusters are capped at the radius of the largest farm
+    hg1.add_child(
+        FarmLayer(
+            farms,
+            "elec_conso_kWh_low",
+            "elec_conso_kWh_high",
+            1e6,
+            shades_salmon,
+            a_elec,
+            b_elec,
+            max_radius=40,
+        )
+    )
+    hg2.add_child(
+        FarmLayer(
+            farms,
+            "carbon_kt_low",
+            "carbon_kt_high",
+            1,
+            shades_brown,
+            a_carbon,
+            b_carbon,
+            max_radius=50,
+        )
+    )
+    return finish_ras_map(map, hg1, hg2, legend_title, title, add_title_legend, french)
@@ -0,0 +1,345 @@
+import os
+import pandas as pd
+
+# Marker of the approximate figures in the datasets, e.g. '~4000000000'
+APPROXIMATE_MARKER = "~"
+# Suffix of the boolean columns flagging the approximate figures of a column
+APPROXIMATE_SUFFIX = " (approximate)"
+
+
+class SchemaError(ValueError):
+    """Raised when a dataset does not match its schema"""
+
+
+# Schema of each dataset, by file name:
+#     columns (dict): dtype of each column, in the order of the file
+#     decimal (str): decimal separator of the numbers, default is '.'
+#     thousands (str): thousands separator of the numbers, default is None
+#     approximate (list): numeric columns whose figures can start with the approximate marker,
+#         flagged in a boolean column named with APPROXIMATE_SUFFIX
+#     nullable (list): columns which can have missing values, the others cannot
+SCHEMAS = {
+    "discrease_wild_salmon_1.1.csv": {
+        "columns": {
+            "Year": "int64",
+            "Tons of wild salmon catch in Atlantic waters": "int64",
+        },
+    },
+    "hyper_growth_salmon_farming_1.2.csv": {
+        "columns": {
+            "Year": "int64",
+            "Tonnes - live weight": "float64",
+            "Country": "str",
+        },
+        "decimal": ",",
+    },
+    "numbers_salmons_farmed_1.0.csv": {
+        "columns": {
+            "Unnamed: 0": "int64",
+            "Year": "int64",
+            "Tonnes - live weight": "float64",
+            "Number of salmons (5kg each)": "int64",
+        },
+    },
+    "top_10_countries_producing_1.3.csv": {
+        "columns": {
+            "Flag": "str",
+            "Country": "str",
+            "Tons": "float64",
+            "% of total": "str",
+        },
+        "decimal": ",",
+    },
+    "top_15_countries_consuming_1.5.csv": {
+        "columns": {
+            "Country": "str",
+            "Flag": "str",
+            "Apparent consumption": "float64",
+            "Apparent consumption per capita": "float64",
+            "Production (Capture + Aquaculture)": "float64",
+            "Export": "float64",
+            "Import": "float64",
+        },
+    },
+    "top_10_companies_producing_2.1.csv": {
+        "columns": {
+            "Company": "str",
+            "Flag": "str",
+            "Country": "str",
+            "Volume, in tons, 2022": "int64",
+            "Commercial name": "str",
+            "Creation date": "int64",
+            "Headquarters": "str",
+            "Website": "str",
+            "Revenues 2022": "int64",
+            "Employees 2022": "int64",
+            "Note": "str",
+        },
+        "approximate": ["Revenues 2022", "Employees 2022"],
+        "nullable": ["Note"],
+    },
+    "top_10_ras_companies_2.3.csv": {
+        "columns": {
+            "Parent company": "str",
+            "Production in tonnes": "int64",
+            "Number of projects": "int64",
+            "Countries of projects": "str",
+            "Commercial name": "str",
+            "Creation date": "float64",
+            "Headquarters": "str",
+            "Flag": "str",
+            "Website": "str",
+            "Revenues 2022 dollars": "float64",
+            "Employees 2022": "float64",
+            "Note": "str",
+        },
+        "nullable": [
+            "Commercial name",
+            "Creation date",
+            "Headquarters",
+            "Website",
+            "Revenues 2022 dollars",
+            "Employees 2022",
+            "Note",
+        ],
+    },
+    "mortality_rates_4.4.csv": {
+        "columns": {
+            "Year": "int64",
+            "Company": "str",
+            "Area": "str",
+            "Mortality_rate": "float64",
+        },
+        "decimal": ",",
+        "nullable": ["Area"],
+    },
+    "discrease_wild_salmon_1.1_fr.csv": {
+        "columns": {
+            "Année": "int64",
+            "Saumons pêchés dans l'Atlantique en tonnes": "int64",
+        },
+    },
+    "hyper_growth_salmon_farming_1.2_fr.csv": {
+        "columns": {
+            "Année": "int64",
+            "Tonnes de saumons produits en élevage": "float64",
+            "Pays": "str",
+        },
+        "decimal": ",",
+    },
+    "numbers_salmons_farmed_1.0_fr.csv": {
+        "columns": {
+            "Année": "int64",
+            "Tonnes de saumon produit en élevage": "float64",
+            "Nombre de saumons (5kg chacun)": "int64",
+        },
+    },
+    "top_10_countries_producing_1.3_fr.csv": {
+        "columns": {
+            "Drapeau": "str",
+            "Pays": "str",
+            "Tonnes de saumon": "float64",
+            "% du total": "str",
+        },
+        "decimal": ",",
+    },
+    "top_15_countries_consuming_1.5_fr.csv": {
+        "columns": {
+            "Pays": "str",
+            "Drapeau": "str",
+            "Consommation apparente": "float64",
+            "Consommation apparente par habitant": "float64",
+            "Production (Capture + Aquaculture)": "float64",
+            "Export": "float64",
+            "Import": "float64",
+        },
+    },
+    "top_10_companies_producing_2.1_fr.csv": {
+        "columns": {
+            "Producteur": "str",
+            "Drapeau": "str",
+            "Pays": "str",
+            "Tonnes de saumon 2022": "int64",
+            "Nom commercial": "str",
+            "Date de création": "int64",
+            "Siège": "str",
+            "Site internet": "str",
+            "Revenus 2022": "int64",
+            "Employés 2022": "int64",
+            "Note": "str",
+        },
+        "approximate": ["Revenus 2022", "Employés 2022"],
+        "nullable": ["Note"],
+    },
+    "top_10_ras_companies_2.3_fr.csv": {
+        "columns": {
+            "Producteur": "str",
+            "Production en tonnes": "int64",
+            "Nombre de projets": "int64",
+            "Pays des projets": "str",
+            "Nom commercial": "str",
+            "Date de création": "float64",
+            "Siège": "str",
+            "Drapeau": "str",
+            "Site internet": "str",
+            "Revenus 2022 dollars": "float64",
+            "Employés 2022": "float64",
+            "Note": "str",
+        },
+        "nullable": [
+            "Nom commercial",
+            "Date de création",
+            "Siège",
+            "Site internet",
+            "Revenus 2022 dollars",
+            "Employés 2022",
+            "Note",
+        ],
+    },
+    "mortality_rates_4.4_fr.csv": {
+        "columns": {
+            "Année": "int64",
+            "Producteur": "str",
+            "Région": "str",
+            "Taux de mortalité": "float64",
+        },
+        "decimal": ",",
+        "nullable": ["Région"],
+    },
+    "ras_projects_for_map_2.4.csv": {
+        "columns": {
+            "Unnamed: 0": "int64",
+            "Parent company": "str",
+            "Production Max": "float64",
+            "Link info (no text)": "str",
+            "Technologie": "str",
+            "Species": "str",
+            "Latest update": "float64",
+            "Country": "str",
+            "Location": "str",
+            "Location source": "str",
+            "Carbon intensity of electricity - gCO2/kWh": "float64",
+            "elec_conso_kWh_low": "float64",
+            "elec_conso_kWh_high": "float64",
+            "carbon_kt_low": "float64",
+            "carbon_kt_high": "float64",
+            "Detailed status": "str",
+            "Status": "str",
+            "Lat": "float64",
+            "Long": "float64",
+        },
+        "nullable": [
+            "Location source",
+            "Carbon intensity of electricity - gCO2/kWh",
+            "carbon_kt_low",
+            "carbon_kt_high",
+            "Lat",
+            "Long",
+        ],
+    },
+    "evolution_salmon_farming_country_iso_1.4.csv": {
+        "columns": {
+            "Unnamed: 0": "int64",
+            "Year": "int64",
+            "Tonnes - live weight": "float64",
+            "Country": "str",
+            "alpha-3": "str",
+        },
+        "nullable": ["alpha-3"],
+    },
+    "ras_projects_for_map_2.4_fr.csv": {
+        "columns": {
+            "Unnamed: 0": "int64",
+            "Parent company": "str",
+            "Production Max": "float64",
+            "Link info (no text)": "str",
+            "Technologie": "str",
+            "Species": "str",
+            "Latest update": "float64",
+            "Country": "str",
+            "Location": "str",
+            "Location source": "str",
+            "Carbon intensity of electricity - gCO2/kWh": "float64",
+            "elec_conso_kWh_low": "float64",
+            "elec_conso_kWh_high": "float64",
+            "carbon_kt_low": "float64",
+            "carbon_kt_high": "float64",
+            "Detailed status": "str",
+            "Status": "str",
+            "Lat": "float64",
+            "Long": "float64",
+        },
+        "nullable": [
+            "Country",
+            "Location source",
+            "Carbon intensity of electricity - gCO2/kWh",
+            "carbon_kt_low",
+            "carbon_kt_high",
+            "Lat",
+            "Long",
+        ],
+    },
+    "evolution_salmon_farming_country_iso_1.4_fr.csv": {
+        "columns": {
+            "Année": "int64",
+            "Pays": "str",
+            "Tonnes de saumons": "float64",
+            "alpha-3": "str",
+        },
+        "nullable": ["alpha-3"],
+    },
+}
+
+
+def validate(df, schema, path=""):
+    """Raises a SchemaError if a parsed dataframe does not have the columns of its schema or
+    has missing values in a column which is not nullable"""
+    expected = list(schema["columns"])
+    if list(df.columns) != expected:
+        raise SchemaError(f"{path}: columns {list(df.columns)} instead of {expected}")
+    nullable = schema.get("nullable", [])
+    missing = [col for col in expected if col not in nullable and df[col].isna().any()]
+    if missing:
+        raise SchemaError(f"{path}: missing values in {', '.join(missing)}")
+
+
+def read_typed_csv(path, schema=None):
+    """Returns the dataframe of a csv file parsed with the schema of its dataset
+    Parameters:
+            path (str): path of the csv file
+            schema (dict): schema of the file, default is the one of SCHEMAS for its name,
+                files without a schema are parsed with type inference
+    Returns:
+            df (pd.DataFrame): dataframe with the dtypes of the schema
+    """
+    if schema is None:
+        schema = SCHEMAS.get(os.path.basename(path))
+    if schema is None:
+        return pd.read_csv(path)
+
+    columns = schema["columns"]
+    approximate = schema.get("approximate", [])
+    # The approximate columns are read as text to remove their marker
+    dtype = {col: "str" if col in approximate else col_type for col, col_type in columns.items()}
+    try:
+        df = pd.read_csv(
+            path,
+            dtype=dtype,
+            decimal=schema.get("decimal", "."),
+            thousands=schema.get("thousands"),
+        )
+        validate(df, schema, path)
+        for col in approximate:
+            text = df[col].str.strip()
+            df[col + APPROXIMATE_SUFFIX] = text.str.startswith(APPROXIMATE_MARKER).fillna(False)
+            # Read as text, so the separators of the schema are not applied by read_csv
+            text = text.str.removeprefix(APPROXIMATE_MARKER)
+            if schema.get("thousands"):
+                text = text.str.replace(schema["thousands"], "", regex=False)
+            text = text.str.replace(schema.get("decimal", "."), ".", regex=False)
+            df[col] = pd.to_numeric(text).astype(columns[col])
+    except SchemaError:
+        raise
+    except (ValueError, TypeError) as e:
+        raise SchemaError(f"{path}: {e}") from e
+    return df
@@ -0,0 +1,174 @@
+import base64
+import numpy as np
+import plotly.io as pio
+
+# plotly.js typed array dtypes, there is no 64 bits integer
+TYPED_ARRAY_DTYPES = {
+    "float64": "f8",
+    "float32": "f4",
+    "int32": "i4",
+    "uint32": "u4",
+    "int16": "i2",
+    "uint16": "u2",
+    "int8": "i1",
+    "uint8": "u1",
+}
+
+
+def encode_typed_array(values, min_length=8):
+    """Returns a numeric array as a plotly.js typed array {dtype, bdata, shape}
+    Parameters:
+            values (list or np.ndarray): values of a trace attribute
+            min_length (int): shorter arrays are left as they are, default is 8
+    Returns:
+            values (dict or same as input): the typed array, or the input if it is not numeric
+    """
+    if isinstance(values, (list, tuple)):
+        if len(values) < min_length or not all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) for v in values
+        ):
+            return values
+        values = np.asarray(values)
+    if values.size < min_length or values.dtype.kind not in "iuf":
+        return values
+
+    # Whole floats (e.g. tonnes) are smaller as integers
+    is_whole = values.dtype.kind == "f" and np.isfinite(values).all()
+    if is_whole and (values == np.round(values)).all():
+        values = values.astype(np.int64)
+
+    # Integers are stored in the smallest type that fits, as 64 bits integers are not supported
+    if values.dtype.kind in "iu":
+        for dtype in (np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32):
+            info = np.iinfo(dtype)
+            if values.min() >= info.min and values.max() <= info.max:
+                values = values.astype(dtype)
+                break
+        else:
+            values = values.astype(np.float64)
+    elif values.dtype not in (np.float32, np.float64):
+        values = values.astype(np.float64)
+
+    typed_array = {
+        "dtype": TYPED_ARRAY_DTYPES[values.dtype.name],
+        "bdata": base64.b64encode(np.ascontiguousarray(values).tobytes()).decode("ascii"),
+    }
+    if values.ndim > 1:
+        typed_array["shape"] = ",".join(str(n) for n in values.shape)
+    return typed_array
+
+
+def encode_trace_arrays(obj, min_length=8):
+    """Returns a trace dict with its numeric arrays, nested ones included, as typed arrays"""
+    if isinstance(obj, dict):
+        return {key: encode_trace_arrays(value, min_length) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple, np.ndarray)):
+        encoded = encode_typed_array(obj, min_length)
+        if encoded is not obj:
+            return encoded
+        if isinstance(obj, (list, tuple)):
+            return [encode_trace_arrays(value, min_length) for value in obj]
+    return obj
+
+
+# Trace attributes set by plotly express to the value plotly.js would use anyway
+TRACE_DEFAULTS = {
+    "xaxis": "x",
+    "yaxis": "y",
+    "legendgroup": "",
+    "offsetgroup": "",
+    "fillpattern": {"shape": ""},
+}
+MARKER_DEFAULTS = {"symbol": "circle"}
+# Only true when the figure has a single pair of axes
+AXIS_DEFAULTS = {
+    "xaxis": {"anchor": "y", "domain": [0.0, 1.0]},
+    "yaxis": {"anchor": "x", "domain": [0.0, 1.0]},
+}
+
+
+def round_significant(values, digits):
+    """Returns floats rounded to a number of significant digits, except the floats with at least
+    that many digits in their integer part, which are left exact so that the bars and axes keep
+    their values, e.g. 0.5381462711076805 -> 0.5381, 12.3456 -> 12.35 and 16490.52 -> 16490.52
+    with 4 digits
+    Parameters:
+            values (np.ndarray or float): floats to round
+            digits (int): number of significant digits
+    Returns:
+            values (np.ndarray or float): rounded floats
+    """
+    values = np.asarray(values, dtype=float)
+    magnitude = np.floor(np.log10(np.abs(values), where=values != 0, out=np.zeros(values.shape)))
+    factor = 10.0 ** (digits - 1 - magnitude)
+    with np.errstate(invalid="ignore"):
+        return np.where(magnitude < digits - 1, np.round(values * factor) / factor, values)
+
+
+def round_trace_arrays(obj, digits, in_array=False):
+    """Returns a trace dict with the floats of its arrays rounded by round_significant"""
+    if isinstance(obj, dict):
+        return {key: round_trace_arrays(value, digits) for key, value in obj.items()}
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == "f":
+            return round_significant(obj, digits)
+        if obj.dtype.kind == "O":
+            # Mixed arrays such as customdata, with text and numbers
+            return np.array(
+                [round_trace_arrays(value, digits, in_array=True) for value in obj], dtype=object
+            )
+        return obj
+    if isinstance(obj, (list, tuple)):
+        return [round_trace_arrays(value, digits, in_array=True) for value in obj]
+    if in_array and isinstance(obj, float):
+        return float(round_significant(obj, digits))
+    return obj
+
+
+def strip_defaults(fig_dict):
+    """Removes the attributes of a figure dict which are equal to the plotly.js defaults"""
+    for trace in fig_dict["data"]:
+        for key, value in TRACE_DEFAULTS.items():
+            if trace.get(key) == value:
+                del trace[key]
+        marker = trace.get("marker", {})
+        for key, value in MARKER_DEFAULTS.items():
+            if marker.get(key) == value:
+                del marker[key]
+        if trace.get("marker") == {}:
+            del trace["marker"]
+
+    layout = fig_dict["layout"]
+    axes = [key for key in layout if key.startswith(("xaxis", "yaxis"))]
+    if set(axes) <= set(AXIS_DEFAULTS):
+        for axis, defaults in AXIS_DEFAULTS.items():
+            for key, value in defaults.items():
+                if axis in layout and layout[axis].get(key) == value:
+                    del layout[axis][key]
+    for axis in axes:
+        if layout[axis].get("title") == {}:
+            del layout[axis]["title"]
+    return fig_dict
+
+
+def figure_to_json(fig, compact=False, engine=None, precision=None):
+    """Returns the json of a plotly figure, to be written to a file as it is
+    Parameters:
+            fig (plotly object): figure to serialise
+            compact (boolean): encode the numeric arrays of the traces and frames as base64
+                typed arrays (plotly.js >= 2.28). Default is False.
+            engine (str): json encoder, 'json' or 'orjson', default uses plotly's setting
+                which picks orjson when it is installed
+            precision (int): significant digits of the floats of the traces, default is None
+                which keeps them as they are
+    Returns:
+            json (str): json string of the figure dict
+    """
+    fig_dict = strip_defaults(fig.to_plotly_json())
+    if precision is not None:
+        fig_dict["data"] = [round_trace_arrays(trace, precision) for trace in fig_dict["data"]]
+    if compact:
+        fig_dict["data"] = [encode_trace_arrays(trace) for trace in fig_dict["data"]]
+        for frame in fig_dict.get("frames", []):
+            frame["data"] = [encode_trace_arrays(trace) for trace in frame.get("data", [])]
+    return pio.json.to_json_plotly(fig_dict, engine=engine)
@@ -2,13 +2,13 @@
 # for testing and iteration
 
 import pinkbombs as pb
-import pandas as pd
+from pinkbombs.graphs.datacache import read_cached
 import plotly.express as px
 
 # Graph 1.0 - Page Story production of salmons
 data1_0_name = 'numbers_salmons_farmed_1.0'
 data1_0_file = "data/"+data1_0_name+".csv"
-df_data1_0 = pd.read_csv(data1_0_file)
+df_data1_0 = read_cached(data1_0_file)
 
 g1_0 = pb.make_area_chart_options(
     df_data1_0,
@@ -22,7 +22,7 @@ g1_0.write_html("pinkbombs/graphs/test_html/" + data1_0_name + ".html")
 
 # Graph 1.0 - Page Story production of salmons - FRENCH
 data1_0_file = "data/"+data1_0_name+"_fr.csv"
-df_data1_0 = pd.read_csv(data1_0_file)
+df_data1_0 = read_cached(data1_0_file)
 
 g1_0 = pb.make_area_chart_options(
     df_data1_0,
@@ -38,7 +38,7 @@ g1_0.write_html("pinkbombs/graphs/test_html/" + data1_0_name + "_fr.html")
 # Graph 1.1 - Wild Altantic salmon collapse
 data1_1_name = "discrease_wild_salmon_1.1"
 data1_1_file = "data/" + data1_1_name + ".csv"
-df_data1_1 = pd.read_csv(data1_1_file)
+df_data1_1 = read_cached(data1_1_file)
 g1_1 = pb.make_area_single_chart(
     df_data1_1,
     "Year",
@@ -52,7 +52,7 @@ g1_1.write_html("pinkbombs/graphs/test_html/" + data1_1_name + ".html")
 
 # Graph 1.1 - Wild Altantic salmon collapse - FRENCH
 data1_1_file = "data/" + data1_1_name + "_fr.csv"
-df_data1_1 = pd.read_csv(data1_1_file)
+df_data1_1 = read_cached(data1_1_file)
 g1_1 = pb.make_area_single_chart(
     df_data1_1,
     "Année",
@@ -68,7 +68,7 @@ g1_1.write_html("pinkbombs/graphs/test_html/" + data1_1_name + "_fr.html")
 # Graph 1.2 - Hyper growth salmon farming
 data1_2_name = "hyper_growth_salmon_farming_1.2"
 data1_2_file = "data/" + data1_2_name + ".csv"
-df_data1_2 = pd.read_csv(data1_2_file)
+df_data1_2 = read_cached(data1_2_file)
 
 g1_2 = pb.make_area_order_chart(
     df_data1_2,
@@ -86,7 +86,7 @@ g1_2.write_html("pinkbombs/graphs/test_html/" + data1_2_name + ".html")
 
 # Graph 1.2 - Wild Altantic salmon collapse - FRENCH
 data1_2_file = "data/" + data1_2_name + "_fr.csv"
-df_data1_2 = pd.read_csv(data1_2_file)
+df_data1_2 = read_cached(data1_2_file)
 
 g1_2 = pb.make_area_order_chart(
     df_data1_2,
@@ -105,7 +105,7 @@ g1_2.write_html("pinkbombs/graphs/test_html/" + data1_2_name + "_fr.html")
 # Graph 1.3 - Main countries producing farmed salmon
 data1_3_name = "top_10_countries_producing_1.3"
 data1_3_file = "data/" + data1_3_name + ".csv"
-df_data1_3 = pd.read_csv(data1_3_file)
+df_data1_3 = read_cached(data1_3_file)
 
 g1_3 = pb.make_color_bar_chart(
     df_data1_3,
@@ -124,7 +124,7 @@ g1_3.write_html("pinkbombs/graphs/test_html/" + data1_3_name + ".html")
 
 # Graph 1.3 - Main countries producing farmed salmon - FRENCH
 data1_3_file = "data/" + data1_3_name + "_fr.csv"
-df_data1_3 = pd.read_csv(data1_3_file)
+df_data1_3 = read_cached(data1_3_file)
 
 g1_3 = pb.make_color_bar_chart(
     df_data1_3,
@@ -144,7 +144,7 @@ g1_3.write_html("pinkbombs/graphs/test_html/" + data1_3_name + "_fr.html")
 # Graph 1.4 -  Evolution of salmon farming by country
 data1_4_name = "evolution_salmon_farming_country_iso_1.4"
 data1_4_file = "data/" + data1_4_name + ".csv"
-df_data1_4 = pd.read_csv(data1_4_file)
+df_data1_4 = read_cached(data1_4_file)
 
 g1_4 = pb.make_animated_bubble_map(
     df_data1_4,
@@ -163,7 +163,7 @@ func1_4.close()
 
 # Graph 1.4 -  Evolution of salmon farming by country - FRENCH
 data1_4_file = "data/" + data1_4_name + "_fr.csv"
-df_data1_4 = pd.read_csv(data1_4_file)
+df_data1_4 = read_cached(data1_4_file)
 
 g1_4 = pb.make_animated_bubble_map(
     df_data1_4,
@@ -183,7 +183,7 @@ func1_4.close()
 # Graph 1.5 - Top 15 countries consuming salmon
 data1_5_name = 'top_15_countries_consuming_1.5'
 data1_5_file = "data/"+data1_5_name+".csv"
-df_data1_5 = pd.read_csv(data1_5_file)
+df_data1_5 = read_cached(data1_5_file)
 
 g1_5=pb.make_double_yaxis_bar_chart(
     df_data1_5,
@@ -211,7 +211,7 @@ g1_5.write_html("pinkbombs/graphs/test_html/" + data1_5_name + ".html")
 # Graph 1.5 - Top 15 countries consuming salmon - FRENCH
 data1_5_name = 'top_15_countries_consuming_1.5'
 data1_5_file = "data/"+data1_5_name+"_fr.csv"
-df_data1_5 = pd.read_csv(data1_5_file)
+df_data1_5 = read_cached(data1_5_file)
 
 g1_5=pb.make_double_yaxis_bar_chart(
     df_data1_5,
@@ -239,7 +239,7 @@ g1_5.write_html("pinkbombs/graphs/test_html/" + data1_5_name + "_fr.html")
 # Graph 2.1 -  Top 10 companies producing salmon
 data2_1_name = "top_10_companies_producing_2.1"
 data2_1_file = "data/" + data2_1_name + ".csv"
-df_data2_1 = pd.read_csv(data2_1_file)
+df_data2_1 = read_cached(data2_1_file)
 
 g2_1 = pb.make_simple_bar_chart(
     df_data2_1,
@@ -268,7 +268,7 @@ g2_1.write_html("pinkbombs/graphs/test_html/" + data2_1_name + ".html")
 
 # Graph 2.1 -  Top 10 companies producing salmon - FRENCH
 data2_1_file = "data/" + data2_1_name + "_fr.csv"
-df_data2_1 = pd.read_csv(data2_1_file)
+df_data2_1 = read_cached(data2_1_file)
 
 g2_1 = pb.make_simple_bar_chart(
     df_data2_1,
@@ -298,7 +298,7 @@ g2_1.write_html("pinkbombs/graphs/test_html/" + data2_1_name + "_fr.html")
 # Graph 2.3 -  Top 10 RAS companies producing salmon
 data2_3_name = "top_10_ras_companies_2.3"
 data2_3_file = "data/" + data2_3_name + ".csv"
-df_data2_3 = pd.read_csv(data2_3_file)
+df_data2_3 = read_cached(data2_3_file)
 
 g2_3 = pb.make_simple_bar_chart(
     df_data2_3,
@@ -321,7 +321,7 @@ g2_3.write_html("pinkbombs/graphs/test_html/" + data2_3_name + ".html")
 
 # Graph 2.3 -  Top 10 RAS companies producing salmon - FRENCH
 data2_3_file = "data/" + data2_3_name + "_fr.csv"
-df_data2_3 = pd.read_csv(data2_3_file)
+df_data2_3 = read_cached(data2_3_file)
 
 g2_3 = pb.make_simple_bar_chart(
     df_data2_3,
@@ -345,7 +345,7 @@ g2_3.write_html("pinkbombs/graphs/test_html/" + data2_3_name + "_fr.html")
 # Graph 2.4 - Map of RAS projects
 data2_4_name = "ras_projects_for_map_2.4"
 data2_4_file = "data/" + data2_4_name + ".csv"
-df_data2_4 = pd.read_csv(data2_4_file)
+df_data2_4 = read_cached(data2_4_file)
 
 g2_4 = pb.make_ras_bubble_map(
     df_data2_4, 
@@ -364,7 +364,7 @@ func.close()
 
 # Graph 2.4 - Map of RAS projects - FRENCH
 data2_4_file = "data/" + data2_4_name + "_fr.csv"
-df_data2_4 = pd.read_csv(data2_4_file)
+df_data2_4 = read_cached(data2_4_file)
 
 g2_4 = pb.make_ras_bubble_map(
     df_data2_4, 
@@ -384,7 +384,7 @@ func.close()
 # Graph 3.5 -  Escapes from marine cages
 data3_5_name = "escapes_marine_cages_3.5"
 data3_5_file = "data/" + data3_5_name + ".csv"
-df_data3_5 = pd.read_csv(data3_5_file)
+df_data3_5 = read_cached(data3_5_file)
 
 g3_5 = pb.make_treemap_chart(
     df_data3_5, 
@@ -401,7 +401,7 @@ g3_5.write_html("pinkbombs/graphs/test_html/" + data3_5_name + ".html")
 # Graph 4.2 - Antibiotics consumption
 data4_2_name = "antibiotic_consumption_chile_4.2"
 data4_2_file = "data/" + data4_2_name + ".csv"
-df_data4_2 = pd.read_csv(data4_2_file)
+df_data4_2 = read_cached(data4_2_file)
 
 g4_2 = pb.make_color_bar_chart2(
     df_data4_2,
@@ -419,7 +419,7 @@ g4_2.write_html("pinkbombs/graphs/test_html/" + data4_2_name + ".html")
 # Graph 4.4 - Escapes from marine cages
 data4_4_name = "mortality_rates_4.4"
 data4_4_file = "data/" + data4_4_name + ".csv"
-df_data4_4 = pd.read_csv(data4_4_file)
+df_data4_4 = read_cached(data4_4_file)
 
 g4_4 = pb.make_simple_box_chart(
     input_df=df_data4_4,
@@ -435,7 +435,7 @@ g4_4.write_html("pinkbombs/graphs/test_html/" + data4_4_name + ".html")
 
 # Graph 4.4 - Escapes from marine cages - FRENCH
 data4_4_file = "data/" + data4_4_name + "_fr.csv"
-df_data4_4 = pd.read_csv(data4_4_file)
+df_data4_4 = read_cached(data4_4_file)
 
 g4_4 = pb.make_simple_box_chart(
     input_df=df_data4_4,
@@ -453,7 +453,7 @@ g4_4.write_html("pinkbombs/graphs/test_html/" + data4_4_name + "_fr.html")
 # Graph 7 - Alternatives 
 data7_name = "alternatives_text_7"
 data7_file = "data/" + data7_name + ".csv"
-df_data_7 = pd.read_csv(data7_file)
+df_data_7 = read_cached(data7_file)
 
 g7 = pb.make_matrix_alternatives(df_data_7, 
                                  max_len=60,
@@ -468,7 +468,7 @@ g7.write_html("pinkbombs/graphs/test_html/alternatives_7.html")
 
 # Graph 7 - Alternatives - FRENCH
 data7_file = "data/" + data7_name + "_fr.csv"
-df_data_7 = pd.read_csv(data7_file)
+df_data_7 = read_cached(data7_file)
 
 g7 = pb.make_matrix_alternatives(df_data_7, 
                                  max_len=60,
@@ -4,6 +4,23 @@ import plotly.express as px
 from plotly.graph_objects import Figure, Scatter, Heatmap
 import textwrap
 from plotly.subplots import make_subplots
+from .formatting import format_number, format_currency, add_prefix
+from .downsample import downsample, top_n_others
+from .schemas import APPROXIMATE_MARKER, APPROXIMATE_SUFFIX
+
+
+def select_columns(input_df, columns):
+    """Returns the columns of a dataframe that a builder uses, once each and in this order
+    The builders modify this projection and never their input, so a frame can be shared by
+    several builds. The names missing from input_df are ignored, e.g. the renamed columns.
+    Parameters:
+            input_df (pd.DataFrame): input of the builder
+            columns (list(str)): names of the columns used by the builder
+    Returns:
+            output_df (pd.DataFrame): new dataframe with only these columns
+    """
+    columns = [col for col in dict.fromkeys(columns) if col in input_df.columns]
+    return input_df[columns]
 
 
 def make_area_chart(input_df: pd.DataFrame, input_x: str, input_y: str) -> Figure:
@@ -28,6 +45,7 @@ def make_area_single_chart(
     theme="simple_white",
     source_text="",
     block_zoom=False,
+    max_points=None,
 ) -> Figure:
     """Returns plotly express object as area chart with a single line
     Parameters:
@@ -39,9 +57,12 @@ def make_area_single_chart(
             theme (str): plotly chart theme, default is 'simple_white'
             source_text (string): Text to display as source at the bottom. Default is empty.
             block_zoom (boolean): Decide if plotly should block the zoom. Default is False.
+            max_points (int): maximum number of points, the series is downsampled with LTTB
+                above it. Default is None, all the points are shown.
     Returns:
             area (plotly object): output chart object
     """
+    input_df = downsample(input_df, input_x, input_y, max_points)
     area = px.area(
         input_df,
         x=input_x,
@@ -97,13 +118,6 @@ def make_area_order_chart_grouped(
     Returns:
             area (plotly object): output chart object
     """
-    # Data cleaning
-    try:
-        input_df[input_y] = input_df[input_y].str.replace(",", ".")
-        input_df[input_y] = input_df[input_y].astype(float)
-    except Exception as e:
-        print("Input is not in string format")
-
     input_df = input_df.groupby(input_x)[input_y].sum().reset_index()
     input_df["color"] = color
 
@@ -135,6 +149,9 @@ def make_area_order_chart(
     hide_zoom=False,
     palette=px.colors.qualitative.Dark24,
     theme="simple_white",
+    top_n=None,
+    others_label="Others",
+    max_points=None,
 ) -> Figure:
     """Returns plotly express object as area chart with multiple lines
     Parameters:
@@ -150,12 +167,15 @@ def make_area_order_chart(
             hide_zoom (boolean): to hide the zoom in top right corner
             palette (px.object): plotly discrete palette, default is Dark24
             theme (str): plotly chart theme, default is 'simple_white'
+            top_n (int): number of areas shown, the others are summed in a single area.
+                Default is None, all the areas are shown.
+            others_label (str): name of the area of the others, default is 'Others'
+            max_points (int): maximum number of points per area, the series are downsampled
+                with LTTB above it. Default is None, all the points are shown.
     Returns:
             area (plotly object): output chart object
     """
-    # Data cleaning - TO REMOVE
-    input_df[input_y] = input_df[input_y].str.replace(",", ".")
-    input_df[input_y] = input_df[input_y].astype(float)
+    input_df = select_columns(input_df, [input_x, input_y, input_col])
 
     if reorder:
         input_df_agg = input_df.groupby(input_col)[input_y].sum().sort_values(ascending=False)
@@ -163,6 +183,9 @@ def make_area_order_chart(
         input_df_u = input_df.set_index(input_col)
         input_df = input_df_u.loc[myorder].reset_index()
 
+    input_df = top_n_others(input_df, input_x, input_y, input_col, top_n, others_label)
+    input_df = downsample(input_df, input_x, input_y, max_points, input_col)
+
     area = px.area(
         input_df,
         x=input_x,
@@ -218,6 +241,7 @@ def make_area_chart_options(
     color_area="#fd442f",
     color_axis="white",
     theme="simple_white",
+    max_points=None,
 ) -> Figure:
     """Returns plotly express object as area chart with single lines
     Parameters:
@@ -230,16 +254,12 @@ def make_area_chart_options(
             color_axis (str): color of the axis, lines and font over transparent background, 
                 default is white
             theme (str): plotly chart theme, default is 'simple_white'
+            max_points (int): maximum number of points, the series is downsampled with LTTB
+                above it. Default is None, all the points are shown.
     Returns:
             area (plotly object): output chart object
     """
-    # Data cleaning
-    try:
-        input_df[input_y] = input_df[input_y].str.replace(",", ".")
-        input_df[input_y] = input_df[input_y].astype(float)
-    except Exception as e:
-        print("Input is not in string format")
-
+    input_df = downsample(input_df, input_x, input_y, max_points)
     fig = px.area(
         input_df,
         x=input_x,
@@ -318,12 +338,7 @@ def make_color_bar_chart(
     Returns:
             bar (plotly object): output chart object
     """
-    # Sort out number format
-    try:
-        input_df[input_x] = input_df[input_x].str.replace(",", ".")
-        input_df[input_x] = input_df[input_x].astype(float)
-    except Exception as e:
-        print("Input is not in string format")
+    input_df = select_columns(input_df, [input_x, input_y1, input_y2])
 
     # Recalculate %
     input_df[input_col] = input_df[input_x] / input_df[input_x].sum()
@@ -333,7 +348,7 @@ def make_color_bar_chart(
     input_df[input_y] = input_df[input_y1] + " " + input_df[input_y2]
 
     # Make figures in tonnes priettier
-    input_df['Production'] = input_df[input_x].apply(lambda x: f"{x:,.0f}") + str(" tonnes")
+    input_df['Production'] = format_number(input_df[input_x], suffix=" tonnes")
 
     bar = px.bar(
         input_df,
@@ -399,12 +414,8 @@ def make_color_bar_chart2(
     Returns:
             bar (plotly object): output chart object
     """
-    # Sort out number format
-    input_df[input_y] = input_df[input_y].str.replace(",", ".")
-    input_df[input_y] = input_df[input_y].astype(float)
-
     # Rename columns
-    input_df = input_df.rename(columns=col_rename)
+    input_df = select_columns(input_df, [input_x, input_y, input_col]).rename(columns=col_rename)
 
     bar = px.bar(
         input_df,
@@ -461,45 +472,38 @@ def make_simple_bar_chart(
             palette (px.object): Plotly discrete palette, default is Pastel1
             theme (str): Plotly chart theme, default is 'simple_white'
             block_zoom (boolean): Decide if plotly should block the zoom. Default is False.
-            fix_approx (boolean): if data has "~" symbol (to remove from this function!)
+            fix_approx (boolean): to prefix the approximate revenues and employees with "~",
+                default is True
     Returns:
             bar (Plotly object): output chart object
     """
     # Reorder the dataframe
-    input_df = input_df.sort_values(input_x, ascending=False)
+    flags = [input_n1 + APPROXIMATE_SUFFIX, input_n2 + APPROXIMATE_SUFFIX]
+    columns = [input_x, input_y1, input_y2, input_n1, input_n2, *input_other, *flags]
+    input_df = select_columns(input_df, columns).sort_values(input_x, ascending=False)
 
     # Concatenate input_y1 and input_y2 to form input_y
     input_y = input_y1 + "_" + input_y2
     input_df[input_y] = input_df[input_y1] + " " + input_df[input_y2]
 
-    if fix_approx:
-        # Remove '~' characters from input_n1 and input_n2 and convert them to integers
-        input_df[input_n1] = input_df[input_n1].str.replace("~", "")
-        input_df[input_n2] = input_df[input_n2].str.replace("~", "")
-        input_df[input_n1] = input_df[input_n1].astype(int)
-        input_df[input_n2] = input_df[input_n2].astype(int)
-
-    # Divide the values in input_n1 by 1,000,000 to display revenues in millions
-    input_df[input_n1] = input_df[input_n1] / 1000000
-    # Format the values with "$" symbol preceding and add "M" for millions and "B" for billions
-    input_df[input_n1] = input_df[input_n1].map(
-        lambda x: f"${x:.1f}M (2022)" if x < 1000 else f"${x/1000:.1f}B (2022)"
-    )
+    # Format the revenues with "$" symbol preceding and "M" for millions and "B" for billions
+    input_df[input_n1] = format_currency(input_df[input_n1], suffix=" (2022)")
 
     # Format the values in input_n2 with commas for thousand separators
-    input_df[input_n2] = input_df[input_n2].apply(lambda x: f"{x:,.0f}") + str(" (2022)")
+    input_df[input_n2] = format_number(input_df[input_n2], suffix=" (2022)")
 
-    # Loop through the DataFrame and update values for the company "Cooke"
-    for index, row in input_df.iterrows():
-        if row[input_y1] == "Cooke":
-            input_df.at[index, input_n2] = "~" + str(row[input_n2])
-            input_df.at[index, input_n1] = "~" + str(row[input_n1])
+    if fix_approx:
+        # The estimates are flagged by the schema of the dataset
+        no_flags = pd.Series(False, index=input_df.index)
+        for column in [input_n1, input_n2]:
+            is_approximate = input_df.get(column + APPROXIMATE_SUFFIX, no_flags)
+            input_df[column] = add_prefix(input_df[column], is_approximate, APPROXIMATE_MARKER)
 
     # Replace NaN values with an empty string in all columns
     input_df = input_df.fillna("")
 
     # Make figures in tonnes priettier
-    input_df['Production'] = input_df[input_x].apply(lambda x: f"{x:,.0f}") + str(" tonnes")
+    input_df['Production'] = format_number(input_df[input_x], suffix=" tonnes")
 
     # Replace revenues 2022 with revenues 
     input_df = input_df.rename(columns={input_n1:input_n1[:-5], input_n2: input_n2[:-5]})
@@ -567,6 +571,7 @@ def make_bar_chart(
             bar (plotly object): output chart object
     """
     # Reorder dataframe
+    input_df = select_columns(input_df, [input_x, input_y, input_other])
     input_df = input_df.sort_values(input_x, ascending=False)
 
     bar = px.bar(
@@ -613,11 +618,15 @@ def make_treemap_chart(
             fig (Plotly object): output treemap chart object
     """
     # Aggregate de dataframe, showing only the top x
+    input_df = select_columns(input_df, [input_x1, input_x2, input_x3, input_y, input_n])
     input_df_top = input_df.sort_values(input_x1, ascending=False).head(top_x)
     input_df_bot = input_df.sort_values(input_x1, ascending=False).loc[top_x:,].sum().to_frame().T
     input_df_bot[input_n] = "Others"
-    input_df_bot[input_x3] = (input_df_bot[input_x1] / input_df_bot[input_x2]).apply(
-        lambda x: f"{x:.2%}"
+    input_df_bot[input_x3] = format_number(
+        input_df_bot[input_x1] / input_df_bot[input_x2] * 100,
+        decimals=2,
+        suffix="%",
+        grouping=False,
     )
     input_df_new = pd.concat([input_df_top, input_df_bot]).reset_index()
 
@@ -693,7 +702,7 @@ def make_simple_pie_chart(
             pie (Plotly object): output chart object
     """
     # Calculate percentages relative to the total
-    input_df[values] = input_df[values].str.replace(",", ".").astype(float)
+    input_df = select_columns(input_df, [names, values, *(hover_data or [])])
     total_sum = input_df[values].sum()
     input_df["Percentage"] = round(input_df[values] / total_sum * 100, 2)
 
@@ -749,15 +758,9 @@ def make_simple_box_chart(
             box (Plotly object): output chart object
     """
     # Reorder the dataframe
+    input_df = select_columns(input_df, [input_x, input_y])
     input_df = input_df.sort_values(input_x, ascending=False)
 
-    # Transform the input_y data
-    try:
-        input_df[input_y] = input_df[input_y].str.replace(",", ".")
-        input_df[input_y] = input_df[input_y].astype(float)
-    except Exception as e:
-        print("Input is not in string format")
-
     # List of order and color
     my_order = input_df.groupby(input_x)[input_y].median().sort_values().index.tolist()
     my_col = ["#151c97"] * (len(my_order) - 1)
@@ -963,7 +966,8 @@ def make_double_yaxis_bar_chart(
             bar (Plotly object): output chart object
     """
     # Reorder the dataframe
-    input_df = input_df.sort_values(input_y1, ascending=False)
+    columns = [input_x1, input_x2, input_y1, input_y2, *input_other]
+    input_df = select_columns(input_df, columns).sort_values(input_y1, ascending=False)
 
     # Concatenate input_y1 and input_y2 to form input_y
     input_x = input_x1 + "_" + input_x2
@@ -975,9 +979,9 @@ def make_double_yaxis_bar_chart(
     input_df[input_other[1]] = np.round(input_df[input_other[1]], 0)
     input_df[input_other[2]] = np.round(input_df[input_other[2]], 0)
 
-    input_df[input_other[0]] = input_df[input_other[0]].apply(lambda x: f"{x:,.0f}")
-    input_df[input_other[1]] = input_df[input_other[1]].apply(lambda x: f"{x:,.0f}")
-    input_df[input_other[2]] = input_df[input_other[2]].apply(lambda x: f"{x:,.0f}")
+    input_df[input_other[0]] = format_number(input_df[input_other[0]])
+    input_df[input_other[1]] = format_number(input_df[input_other[1]])
+    input_df[input_other[2]] = format_number(input_df[input_other[2]])
     # Get a list of all columns except input_x, input_y1, and input_y2
     hover_data = {input_x: False, input_y1: True, input_y2: True}
     for column in input_other:
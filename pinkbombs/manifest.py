@@ -0,0 +1,86 @@
+from graphs import schemas
+from graphs.schemas import SCHEMAS
+from functools import lru_cache
+import hashlib
+import inspect
+import json
+import os
+
+# Fingerprints of the last successful build of each job, next to data/graphs and data/maps
+MANIFEST_PATH = "data/manifest.json"
+
+# Directory of the modules of the graphs package, whose source is part of every fingerprint
+GRAPHS_DIR = os.path.dirname(os.path.abspath(schemas.__file__))
+
+
+def hash_file(path):
+    """Returns the sha256 hex digest of the bytes of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def function_source(function):
+    """Returns the source of a builder, without importing it if it is a LazyFunction"""
+    if hasattr(function, "source"):
+        return function.source()
+    return inspect.getsource(function)
+
+
+@lru_cache(maxsize=None)
+def package_fingerprint(directory=GRAPHS_DIR):
+    """Returns the sha256 hex digest of the source of every module of the graphs package
+    The builders call helpers of the other modules (formatting, serialization, map templates...),
+    so a change anywhere in the package rebuilds the outputs. Computed once per process.
+    """
+    digest = hashlib.sha256()
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".py") and not filename.startswith("test_"):
+            digest.update(filename.encode())
+            digest.update(hash_file(os.path.join(directory, filename)).encode())
+    return digest.hexdigest()
+
+
+def job_fingerprint(entry, options=None, data_dir="data/"):
+    """Returns a fingerprint of everything a registry entry's output depends on
+    Parameters:
+            entry (dict): registry entry from config.py
+            options (dict): build options that change the output, default is None
+            data_dir (str): directory of the input files, default is 'data/'
+    Returns:
+            fingerprint (str): sha256 hex digest, None if the input file is missing
+    """
+    path = data_dir + entry["filename"]
+    if not os.path.exists(path):
+        return None
+
+    digest = hashlib.sha256()
+    digest.update(hash_file(path).encode())
+    # repr() covers the few non-json arguments such as palettes
+    digest.update(json.dumps(entry["arguments"], default=repr).encode())
+    digest.update(json.dumps(entry.get("kwargs", {}), default=repr, sort_keys=True).encode())
+    digest.update(json.dumps(entry.get("precision")).encode())
+    digest.update(function_source(entry["function"]).encode())
+    digest.update(package_fingerprint().encode())
+    digest.update(getattr(entry["parser"], "__qualname__", repr(entry["parser"])).encode())
+    digest.update(json.dumps(SCHEMAS.get(entry["filename"]), sort_keys=True).encode())
+    digest.update(json.dumps(options or {}, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """Returns the manifest as a dict of fingerprints by job key, empty if there is none yet"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    """Writes the manifest with sorted keys so that it diffs nicely"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
@@ -0,0 +1,437 @@
+# HTTP service of the outputs of generate.py, run from the root of the repository:
+#
+#     uvicorn server:app --app-dir pinkbombs --workers 4
+#     python pinkbombs/server.py --port 8000
+#
+# The bodies are read and compressed once, then kept in memory: a request for a cached figure
+# does not touch the disk, and a miss is read and compressed in a thread, off the event loop.
+# Set PINKBOMBS_OUT to serve another directory than data.
+# /render/{kind}/{lang}/{name}?top_x=4 renders an entry with other arguments at request time.
+
+from generate import REGISTRIES, input_path, output_path, render_job
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+import argparse
+import asyncio
+import gzip
+import hashlib
+import inspect
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPES = {
+    "graphs": "application/json",
+    "maps": "text/html; charset=utf-8",
+}
+
+# Bodies are revalidated with their ETag at each use, the versioned plotly.js bundle never changes
+CACHE_CONTROL = "no-cache"
+CACHE_CONTROL_IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Default size of the in-memory cache, compressed variants included
+MAX_CACHE_BYTES = 256 * 2**20
+
+# Bodies larger than this are compressed at a lower brotli quality when they have no .br file:
+# quality 11 takes 15s on the plotly.js bundle, quality 9 takes 0.8s for a 10% larger body
+LARGE_BODY_BYTES = 2**20
+LARGE_BODY_BROTLI_QUALITY = 9
+
+# Default number of rendered bodies kept, and for how long in seconds
+RENDER_CACHE_SIZE = 128
+RENDER_CACHE_TTL = 600
+
+
+class CachedBody:
+    """Body of an output with its compressed variants and their strong ETags
+    Parameters:
+            content (bytes): uncompressed body
+            media_type (str): content type of the body
+            gzip_level (int): gzip compression level, default is 9
+            brotli_quality (int): brotli compression quality, default is 11
+            precompressed (dict): compressed bodies by encoding, e.g. read from the .gz and .br
+                files of generate.py --compress. Default is None.
+    """
+
+    def __init__(
+        self, content, media_type, gzip_level=9, brotli_quality=11, precompressed=None
+    ):
+        self.media_type = media_type
+        precompressed = precompressed or {}
+        digest = hashlib.sha256(content).hexdigest()[:32]
+        # One strong ETag per representation, as the compressed bytes differ
+        self.variants = {"identity": (content, f'"{digest}"')}
+        content_gz = precompressed.get("gzip") or gzip.compress(content, gzip_level)
+        self.variants["gzip"] = (content_gz, f'"{digest}-gz"')
+        if "br" in precompressed or brotli is not None:
+            content_br = precompressed.get("br") or brotli.compress(content, quality=brotli_quality)
+            self.variants["br"] = (content_br, f'"{digest}-br"')
+        self.etags = {etag for (_, etag) in self.variants.values()}
+        self.size = sum(len(body) for (body, _) in self.variants.values())
+
+    def negotiate(self, accept_encoding):
+        """Returns the encoding, the body and the ETag to send for an Accept-Encoding header"""
+        accepted = parse_accept_encoding(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and encoding in accepted:
+                return (encoding, *self.variants[encoding])
+        return ("identity", *self.variants["identity"])
+
+
+def parse_accept_encoding(header):
+    """Returns the set of encodings accepted by a client, e.g. 'gzip, br;q=0' -> {'gzip'}"""
+    accepted = set()
+    for part in (header or "").split(","):
+        (encoding, _, params) = part.strip().partition(";")
+        match = re.search(r"q\s*=\s*([0-9.]+)", params)
+        if encoding and not (match and float(match.group(1)) == 0):
+            accepted.add(encoding.strip().lower())
+    if "*" in accepted:
+        accepted |= {"br", "gzip"}
+    return accepted
+
+
+def etag_matches(if_none_match, etags):
+    """Returns True if an If-None-Match header matches one of the ETags of a body"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, W/ prefixes are ignored
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return not candidates.isdisjoint(etags)
+
+
+class BodyCache:
+    """Least recently used cache of CachedBody by path, bounded by the total size of the bodies
+    Parameters:
+            max_bytes (int): size above which the least recently used bodies are evicted
+    """
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.bodies = OrderedDict()
+        # The misses are loaded in the threads of the server
+        self.lock = threading.Lock()
+
+    def lookup(self, path):
+        """Returns the CachedBody of a file if it is cached, None otherwise"""
+        with self.lock:
+            body = self.bodies.get(path)
+            if body is not None:
+                self.bodies.move_to_end(path)
+            return body
+
+    def get(self, path, media_type):
+        """Returns the CachedBody of a file, reading and compressing it on the first request
+        This blocks for as long as the compression takes, up to a second for a large file, so
+        the routes call fetch instead.
+        """
+        body = self.lookup(path)
+        if body is not None:
+            return body
+
+        with open(path, "rb") as f:
+            content = f.read()
+        precompressed = {}
+        for encoding, extension in (("gzip", ".gz"), ("br", ".br")):
+            sibling = path + extension
+            if os.path.exists(sibling) and os.path.getmtime(sibling) >= os.path.getmtime(path):
+                with open(sibling, "rb") as f:
+                    precompressed[encoding] = f.read()
+        quality = 11 if len(content) <= LARGE_BODY_BYTES else LARGE_BODY_BROTLI_QUALITY
+        body = CachedBody(content, media_type, brotli_quality=quality, precompressed=precompressed)
+        with self.lock:
+            if path in self.bodies:  # loaded meanwhile by another thread
+                return self.bodies[path]
+            self.bodies[path] = body
+            self.size += body.size
+            while self.size > self.max_bytes and len(self.bodies) > 1:
+                (_, evicted) = self.bodies.popitem(last=False)
+                self.size -= evicted.size
+        return body
+
+    async def fetch(self, path, media_type):
+        """Returns the CachedBody of a file, a miss being loaded in a thread so that the event
+        loop keeps serving the other requests meanwhile
+        """
+        body = self.lookup(path)
+        if body is not None:
+            return body
+        return await run_in_threadpool(self.get, path, media_type)
+
+    def clear(self):
+        """Empties the cache, e.g. after a new build"""
+        with self.lock:
+            self.bodies.clear()
+            self.size = 0
+
+
+class RenderCache:
+    """Least recently used cache of rendered bodies which expire after a time to live
+    Concurrent requests of the same key wait for a single render (single-flight).
+    Parameters:
+            maxsize (int): number of bodies kept, default is 128
+            ttl (float): seconds after which a body is rendered again, default is 600
+    """
+
+    def __init__(self, maxsize=RENDER_CACHE_SIZE, ttl=RENDER_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.bodies = OrderedDict()
+        self.pending = {}
+        self.renders = 0
+
+    async def get(self, key, render):
+        """Returns the body of a key, calling render in a thread if it is missing or expired"""
+        hit = self.bodies.get(key)
+        if hit is not None and hit[0] > time.monotonic():
+            self.bodies.move_to_end(key)
+            return hit[1]
+
+        task = self.pending.get(key)
+        if task is None:
+            self.renders += 1
+            task = asyncio.ensure_future(run_in_threadpool(render))
+            self.pending[key] = task
+            task.add_done_callback(lambda task: self.store(key, task))
+        # A client going away must not cancel the render the other clients wait for
+        return await asyncio.shield(task)
+
+    def store(self, key, task):
+        del self.pending[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        self.bodies[key] = (time.monotonic() + self.ttl, task.result())
+        self.bodies.move_to_end(key)
+        while len(self.bodies) > self.maxsize:
+            self.bodies.popitem(last=False)
+
+
+def resolve_arguments(entry, overrides):
+    """Returns the arguments of a registry entry with some of them replaced by name
+    Only the numeric parameters can be replaced, e.g. top_x or min_year, and the values are
+    converted to the type of the current ones so that '4' and '4.0' give the same arguments,
+    and a value which is not an integer is rejected for an integer parameter.
+    Parameters:
+            entry (dict): registry entry from config.py
+            overrides (dict): new values as strings, by parameter name
+    Returns:
+            arguments (list): all the arguments of the function but the dataframe, in order,
+                the "kwargs" of the entry and the defaults included
+    """
+    function = entry["function"]
+    if hasattr(function, "resolve"):
+        function = function.resolve()
+    signature = inspect.signature(function)
+    # The first parameter is the dataframe
+    bound = signature.bind_partial(None, *entry["arguments"], **entry.get("kwargs", {}))
+    bound.apply_defaults()
+    arguments = dict(list(bound.arguments.items())[1:])
+
+    numeric = {
+        key
+        for key, value in arguments.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+    for key, value in overrides.items():
+        if key not in numeric:
+            raise ValueError(f"{key} cannot be set, use one of: {', '.join(sorted(numeric))}")
+        try:
+            number = float(value)
+        except ValueError:
+            raise ValueError(f"{key} must be a number, got {value!r}")
+        if not math.isfinite(number):
+            raise ValueError(f"{key} must be a finite number")
+        if isinstance(arguments[key], int):
+            # int(4.5) would silently give 4
+            if not number.is_integer():
+                raise ValueError(f"{key} must be an integer, got {value!r}")
+            number = int(number)
+        arguments[key] = type(arguments[key])(number)
+    return list(arguments.values())
+
+
+def static_files(out_dir="data"):
+    """Returns the files served next to the outputs, with their media type: the shared plotly.js
+    bundles and the sidecar data of the maps
+    """
+    patterns = [
+        ("maps", r"plotly-[\w.]+\.min\.js", "text/javascript"),
+        ("maps/en", r"[\w-]+-\w+\.json", "application/json"),
+        ("maps/fr", r"[\w-]+-\w+\.json", "application/json"),
+    ]
+    files = []
+    for directory, pattern, media_type in patterns:
+        directory = os.path.join(out_dir, directory)
+        if os.path.isdir(directory):
+            files += [
+                (os.path.join(directory, filename), media_type)
+                for filename in sorted(os.listdir(directory))
+                if re.fullmatch(pattern, filename)
+            ]
+    return files
+
+
+def data_version(path):
+    """Returns a cheap fingerprint of an input file, its modification time and size"""
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def send_body(request, body, cache_control=CACHE_CONTROL):
+    """Returns the response of a CachedBody, 304 if the client already has this version"""
+    (encoding, content, etag) = body.negotiate(request.headers.get("accept-encoding"))
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), body.etags):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=content, media_type=body.media_type, headers=headers)
+
+
+def create_app(
+    out_dir="data",
+    max_bytes=MAX_CACHE_BYTES,
+    preload=True,
+    render_cache_size=RENDER_CACHE_SIZE,
+    render_cache_ttl=RENDER_CACHE_TTL,
+):
+    """Returns the FastAPI application serving the outputs of a build
+    Parameters:
+            out_dir (str): root directory of the outputs, default is 'data'
+            max_bytes (int): size of the in-memory cache, default is 256 MB
+            preload (boolean): read and compress the outputs and the static files (plotly.js
+                bundle, map data) at startup rather than on the first request of
+                each one. Default is True.
+            render_cache_size (int): number of bodies rendered on demand kept, default is 128
+            render_cache_ttl (float): seconds they are kept, default is 600
+    Returns:
+            app (FastAPI): application
+    """
+    cache = BodyCache(max_bytes)
+    render_cache = RenderCache(render_cache_size, render_cache_ttl)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        if preload:
+            for (kind, lang), mapping in REGISTRIES.items():
+                for name in mapping:
+                    path = output_path((kind, lang, name), out_dir)
+                    if os.path.exists(path):
+                        await run_in_threadpool(cache.get, path, MEDIA_TYPES[kind])
+            # The plotly.js bundle is the slowest body to compress, never on a request
+            for path, media_type in static_files(out_dir):
+                await run_in_threadpool(cache.get, path, media_type)
+        yield
+        cache.clear()
+
+    app = FastAPI(
+        title="Pinkbombs",
+        description="Graphs and maps of the Pinkbombs website",
+        lifespan=lifespan,
+    )
+    app.state.cache = cache
+    app.state.render_cache = render_cache
+
+    async def get_output(kind, lang, name):
+        if (kind, lang) not in REGISTRIES or name not in REGISTRIES[(kind, lang)]:
+            raise HTTPException(status_code=404, detail=f"{kind}/{lang}/{name} not found")
+        path = output_path((kind, lang, name), out_dir)
+        try:
+            return await cache.fetch(path, MEDIA_TYPES[kind])
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"{kind}/{lang}/{name} is not built")
+
+    @app.get("/graphs/{lang}/{name}")
+    async def graph(request: Request, lang: str, name: str):
+        return send_body(request, await get_output("graphs", lang, name.removesuffix(".json")))
+
+    @app.get("/maps/{lang}/{name}")
+    async def map_html(request: Request, lang: str, name: str):
+        if name.endswith(".json"):
+            # The data of generate.py --sidecar-data, named after its content
+            if lang not in ("en", "fr") or not re.fullmatch(r"[\w-]+-\w+\.json", name):
+                raise HTTPException(status_code=404, detail=f"{name} not found")
+            try:
+                body = await cache.fetch(
+                    os.path.join(out_dir, "maps", lang, name), "application/json"
+                )
+            except FileNotFoundError:
+                raise HTTPException(status_code=404, detail=f"{name} not found")
+            return send_body(request, body, CACHE_CONTROL_IMMUTABLE)
+        return send_body(request, await get_output("maps", lang, name.removesuffix(".html")))
+
+    @app.get("/maps/{filename}")
+    @app.get("/render/maps/{filename}")
+    async def plotlyjs(request: Request, filename: str):
+        # The shared bundle loaded by the maps as ../plotly-<version>.min.js
+        if not re.fullmatch(r"plotly-[\w.]+\.min\.js", filename):
+            raise HTTPException(status_code=404, detail=f"{filename} not found")
+        try:
+            body = await cache.fetch(os.path.join(out_dir, "maps", filename), "text/javascript")
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"{filename} not found")
+        return send_body(request, body, CACHE_CONTROL_IMMUTABLE)
+
+    @app.get("/render/{kind}/{lang}/{name}")
+    async def render(request: Request, kind: str, lang: str, name: str):
+        if (kind, lang) not in REGISTRIES or name not in REGISTRIES[(kind, lang)]:
+            raise HTTPException(status_code=404, detail=f"{kind}/{lang}/{name} not found")
+        job = (kind, lang, name)
+        try:
+            arguments = resolve_arguments(REGISTRIES[(kind, lang)][name], request.query_params)
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        # The key changes with the input file, so a new csv is picked up without a restart
+        try:
+            version = data_version(input_path(job))
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"{input_path(job)} not found")
+        key = (*job, json.dumps(arguments, default=repr), version)
+
+        def render_body():
+            content = render_job(job, arguments=arguments)
+            # Lighter compression than for the prebuilt outputs, as it delays the response
+            return CachedBody(content.encode(), MEDIA_TYPES[kind], gzip_level=6, brotli_quality=5)
+
+        try:
+            body = await render_cache.get(key, render_body)
+        except Exception:
+            # The arguments were validated above, a failing builder is a bug of the server
+            logger.exception("Rendering %s/%s/%s with %s failed", kind, lang, name, arguments)
+            raise HTTPException(
+                status_code=500, detail=f"{kind}/{lang}/{name} could not be rendered"
+            )
+        return send_body(request, body)
+
+    return app
+
+
+app = create_app(os.environ.get("PINKBOMBS_OUT", "data"))
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the graphs and maps of the website")
+    parser.add_argument("--host", default="127.0.0.1", help="default: 127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000, help="default: 8000")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (default: 1)")
+    args = parser.parse_args()
+    uvicorn.run("server:app", host=args.host, port=args.port, workers=args.workers)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules are imported as the scripts of pinkbombs/ import them, e.g. 'graphs.serialize'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
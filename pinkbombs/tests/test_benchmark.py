@@ -0,0 +1,36 @@
+import json
+
+import pandas as pd
+
+from benchmark import compare, inflate_frame, load_baselines, save_baseline
+
+
+def test_a_time_increase_within_the_spread_of_the_repeats_is_noise():
+    baseline = {"job": {"time_s": 0.10, "time_spread_s": 0.02}}
+    assert compare({"job": {"time_s": 0.15, "time_spread_s": 0.01}}, baseline, 0.2) == []
+    assert compare({"job": {"time_s": 0.20, "time_spread_s": 0.01}}, baseline, 0.2) != []
+
+
+def test_any_size_increase_above_the_threshold_is_a_regression():
+    baseline = {"job": {"bytes": 1000, "peak_mb": 10.0}}
+    regressions = compare({"job": {"bytes": 1300, "peak_mb": 10.5}}, baseline, 0.2)
+    assert len(regressions) == 1 and regressions[0].startswith("job bytes")
+
+
+def test_the_times_are_saved_apart_from_the_shared_metrics(tmp_path):
+    results = {"job": {"time_s": 0.1, "time_spread_s": 0.01, "peak_mb": 1.0, "bytes": 10}}
+    shared, local = tmp_path / "baseline.json", tmp_path / "local.json"
+    save_baseline(results, str(shared), ("peak_mb", "bytes"))
+    save_baseline(results, str(local), ("time_s", "time_spread_s"))
+    assert json.loads(shared.read_text()) == {"job": {"peak_mb": 1.0, "bytes": 10}}
+    assert load_baselines([str(shared), str(local)]) == results
+
+
+def test_inflate_frame_renames_the_entities_of_each_year():
+    df = pd.DataFrame(
+        {"Country": ["Norway", "Chile"] * 2, "Year": [2020, 2020, 2021, 2021], "Tonnes": 1.0}
+    )
+    inflated = inflate_frame(df, 3)
+    assert len(inflated) == 12
+    assert not inflated.duplicated(["Country", "Year"]).any()
+    assert set(inflated["Country"]) >= {"Norway", "Norway 1", "Chile 2"}
@@ -0,0 +1,68 @@
+import gzip
+import os
+
+from compress import brotli, compress_file, compress_files, update_size_report
+
+CONTENT = b'{"data": [' + b", ".join(b"%d" % i for i in range(5000)) + b"]}"
+
+
+def output(tmp_path, content=CONTENT):
+    path = tmp_path / "top-10.json"
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_the_siblings_decompress_to_the_file(tmp_path):
+    path = output(tmp_path)
+    sizes = compress_file(path)
+    assert sizes["raw"] == len(CONTENT)
+    with open(path + ".gz", "rb") as f:
+        assert gzip.decompress(f.read()) == CONTENT
+    assert sizes[".gz"] == os.path.getsize(path + ".gz") < len(CONTENT)
+    if brotli is not None:
+        with open(path + ".br", "rb") as f:
+            assert brotli.decompress(f.read()) == CONTENT
+
+
+def test_the_same_content_gives_the_same_gz(tmp_path):
+    path = output(tmp_path)
+    compress_file(path)
+    with open(path + ".gz", "rb") as f:
+        first = f.read()
+    # The header has no modification time
+    assert first[4:8] == bytes(4)
+    os.remove(path + ".gz")
+    os.utime(path, (1e9, 1e9))
+    compress_file(path)
+    with open(path + ".gz", "rb") as f:
+        assert f.read() == first
+
+
+def test_up_to_date_siblings_are_kept_and_stale_ones_rewritten(tmp_path):
+    path = output(tmp_path)
+    compress_file(path)
+    os.utime(path, (1e9, 1e9))
+    os.utime(path + ".gz", (2e9, 2e9))
+    compress_file(path)
+    assert os.path.getmtime(path + ".gz") == 2e9
+
+    # A rebuilt output is newer than its siblings, which are compressed again
+    with open(path, "wb") as f:
+        f.write(b"{}")
+    os.utime(path, (3e9, 3e9))
+    assert compress_file(path)["raw"] == 2
+    with open(path + ".gz", "rb") as f:
+        assert gzip.decompress(f.read()) == b"{}"
+
+
+def test_compress_files_in_parallel_and_report_the_sizes(tmp_path):
+    paths = [output(tmp_path)]
+    (tmp_path / "maps").mkdir()
+    paths.append(str(tmp_path / "maps" / "ras-map.html"))
+    with open(paths[1], "wb") as f:
+        f.write(CONTENT * 2)
+    sizes = compress_files(paths, n_jobs=2)
+    assert sizes == {path: compress_file(path) for path in paths}
+    report = update_size_report(sizes, str(tmp_path / "sizes.json"), str(tmp_path))
+    assert sorted(report) == ["maps/ras-map.html", "top-10.json"]
+    assert report["maps/ras-map.html"]["raw"] == 2 * len(CONTENT)
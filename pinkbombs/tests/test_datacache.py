@@ -0,0 +1,64 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from graphs.datacache import cache_path, pyarrow, read_cached
+from graphs.schemas import read_typed_csv
+
+pytestmark = pytest.mark.skipif(pyarrow is None, reason="the cache needs pyarrow")
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "data.csv"
+    pd.DataFrame(
+        {
+            "Year": range(2000, 2500),
+            "Tonnes": np.arange(500) / 3,
+            "Country": ["Norway", None] * 250,
+        }
+    ).to_csv(path, index=False)
+    return str(path)
+
+
+def test_cached_frame_is_the_parsed_one(source, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    expected = read_typed_csv(source)
+    pd.testing.assert_frame_equal(read_cached(source, cache_dir=cache_dir), expected)
+    assert os.path.exists(cache_path(source, cache_dir=cache_dir))
+    pd.testing.assert_frame_equal(read_cached(source, cache_dir=cache_dir), expected)
+
+
+def test_modified_file_replaces_its_cached_frame(source, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    read_cached(source, cache_dir=cache_dir)
+    pd.DataFrame({"Year": [1]}).to_csv(source, index=False)
+    os.utime(source, ns=(0, 0))
+    assert read_cached(source, cache_dir=cache_dir)["Year"].tolist() == [1]
+    assert os.listdir(cache_dir) == [os.path.basename(cache_path(source, cache_dir=cache_dir))]
+
+
+@pytest.mark.parametrize("executor", [ThreadPoolExecutor, ProcessPoolExecutor])
+def test_concurrent_cold_reads(source, tmp_path, executor):
+    expected = read_typed_csv(source)
+    for attempt in range(10):
+        cache_dir = str(tmp_path / f"cache-{executor.__name__}-{attempt}")
+        with executor(max_workers=8) as pool:
+            futures = [
+                pool.submit(read_cached, source, read_typed_csv, cache_dir) for _ in range(16)
+            ]
+            for future in futures:
+                pd.testing.assert_frame_equal(future.result(), expected)
+        # A single cached frame, and no temporary file left
+        assert os.listdir(cache_dir) == [os.path.basename(cache_path(source, cache_dir=cache_dir))]
+
+
+def test_unwritable_cache_falls_back_to_the_parsed_frame(source, tmp_path):
+    # The cache directory cannot be created where a file is
+    cache_dir = tmp_path / "cache"
+    cache_dir.write_text("")
+    df = read_cached(source, cache_dir=str(cache_dir))
+    pd.testing.assert_frame_equal(df, read_typed_csv(source))
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from graphs.downsample import lttb
+
+
+def test_keeps_the_endpoints_and_the_requested_number_of_points():
+    x = np.arange(1000)
+    y = np.sin(x / 50)
+    kept = lttb(x, y, 100)
+    assert len(kept) == 100
+    assert kept[0] == 0 and kept[-1] == 999
+    assert (np.diff(kept) > 0).all()
+
+
+def test_keeps_a_peak():
+    y = np.zeros(500)
+    y[321] = 10
+    assert 321 in lttb(np.arange(500), y, 20)
+
+
+def test_keeps_every_point_of_a_short_series():
+    assert lttb([1, 2, 3], [4, 5, 6], 10).tolist() == [0, 1, 2]
+
+
+def test_needs_at_least_3_points():
+    with pytest.raises(ValueError):
+        lttb(np.arange(10), np.arange(10), 2)
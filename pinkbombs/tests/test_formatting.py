@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from graphs.formatting import format_currency, format_number, format_range, format_significant
+
+VALUES = np.concatenate(
+    [
+        np.random.default_rng(0).normal(0, 1e6, 2000),
+        np.round(np.random.default_rng(1).uniform(0, 1000, 2000), 3),
+        [0.5, 1.5, 2.5, 0.125, 221.65, -0.4, 999.5, 999999.5, 1e12, np.inf],
+        # Around 2**53, where the floats are no longer exact integers
+        [2.0**53 - 1, 2.0**53, 2.0**53 + 2, 1e16, 1e17, 1e19, -1e19],
+    ]
+)
+
+
+@pytest.mark.parametrize("decimals", [0, 1, 2])
+@pytest.mark.parametrize("grouping", [True, False])
+@pytest.mark.parametrize("width", [0, 8])
+def test_format_number_matches_python(decimals, grouping, width):
+    spec = "{:" + (str(width) if width else "") + ("," if grouping else "") + f".{decimals}f}}"
+    output = format_number(VALUES, decimals, grouping=grouping, width=width)
+    assert output.tolist() == [spec.format(x) for x in VALUES]
+
+
+def test_format_number_large_values():
+    assert format_number([1e17], 2).tolist() == ["100,000,000,000,000,000.00"]
+    assert format_number([1e16], 3).tolist() == ["10,000,000,000,000,000.000"]
+
+
+def test_format_number_prefix_suffix_and_missing_values():
+    output = format_number(pd.Series([1234567.891, np.nan], index=[3, 4]), 2, "~", " t")
+    assert output.index.tolist() == [3, 4]
+    assert output[3] == "~1,234,567.89 t"
+    assert np.isnan(output[4])
+
+
+def test_format_significant():
+    output = format_significant([0.1234, 12.345, 1234.5, np.nan], suffix=" GWh")
+    assert output.tolist()[:3] == ["0.12 GWh", "12.3 GWh", "1,234 GWh"]
+    assert np.isnan(output[3])
+
+
+def test_format_range_writes_missing_bounds():
+    output = format_range(pd.Series([1.0, np.nan]), pd.Series([2.0, 3.0]), suffix=" GWh")
+    assert output.tolist() == ["1.00 - 2.00 GWh", "nan - 3.00 GWh"]
+
+
+def test_format_currency():
+    assert format_currency([1420552446, 5e6]).tolist() == ["$1.4B", "$5.0M"]
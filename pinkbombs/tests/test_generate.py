@@ -0,0 +1,71 @@
+import json
+import os
+
+import generate
+from generate import build, job_key, output_path, select_jobs, stale_jobs
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "..")
+
+JOBS = [
+    ("graphs", "en", "top-10"),
+    ("graphs", "en", "hyper-growth"),
+    ("graphs", "fr", "hyper-growth"),
+    ("maps", "fr", "ras-map"),
+]
+
+
+def test_select_jobs_without_filters_keeps_everything():
+    assert select_jobs(JOBS) == JOBS
+
+
+def test_select_jobs_by_name_or_key_glob():
+    assert select_jobs(JOBS, ["hyper-*"]) == JOBS[1:3]
+    assert select_jobs(JOBS, ["maps/fr/*", "top-10"]) == [JOBS[0], JOBS[3]]
+    assert select_jobs(JOBS, ["unknown"]) == []
+
+
+def test_select_jobs_by_language_and_kind():
+    assert select_jobs(JOBS, langs=["fr"]) == JOBS[2:]
+    assert select_jobs(JOBS, langs=["fr"], kinds=["graphs"]) == [JOBS[2]]
+    assert select_jobs(JOBS, ["hyper-*"], langs=["en"]) == [JOBS[1]]
+
+
+def test_a_failing_job_does_not_stop_the_others(tmp_path, monkeypatch):
+    def render_job(job, options=None, arguments=None, out_dir="data"):
+        if job[2] == "broken":
+            raise ValueError("no data")
+        return json.dumps(job)
+
+    monkeypatch.setattr(generate, "render_job", render_job)
+    jobs = [("graphs", "en", "first"), ("graphs", "en", "broken"), ("maps", "fr", "last")]
+    errors = build(jobs, out_dir=str(tmp_path))
+    assert list(errors) == [("graphs", "en", "broken")]
+    assert "ValueError: no data" in errors[("graphs", "en", "broken")]
+    for job in (jobs[0], jobs[2]):
+        with open(output_path(job, str(tmp_path))) as f:
+            assert json.load(f) == list(job)
+    assert not os.path.exists(output_path(jobs[1], str(tmp_path)))
+
+
+def test_the_worker_processes_write_the_outputs_and_return_the_errors(tmp_path, monkeypatch):
+    # The jobs read their inputs from data/
+    monkeypatch.chdir(ROOT)
+    jobs = [("graphs", "en", "top-10"), ("graphs", "xx", "top-10")]
+    errors = build(jobs, n_jobs=2, out_dir=str(tmp_path))
+    assert list(errors) == [("graphs", "xx", "top-10")]
+    with open(output_path(jobs[0], str(tmp_path))) as f:
+        assert json.load(f)["data"]
+
+
+def test_stale_jobs_are_the_changed_the_new_and_the_missing_ones(tmp_path):
+    jobs = [("graphs", "en", name) for name in ("same", "changed", "new", "deleted", "no-data")]
+    fingerprints = {job: "a" for job in jobs}
+    fingerprints[("graphs", "en", "no-data")] = None
+    manifest = {job_key(job): "a" for job in jobs if job[2] != "new"}
+    manifest["graphs/en/changed"] = "b"
+    for job in jobs:
+        if job[2] != "deleted":
+            os.makedirs(os.path.dirname(output_path(job, str(tmp_path))), exist_ok=True)
+            open(output_path(job, str(tmp_path)), "w").close()
+    stale = stale_jobs(jobs, fingerprints, manifest, str(tmp_path))
+    assert [job[2] for job in stale] == ["changed", "new", "deleted", "no-data"]
@@ -0,0 +1,49 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from graphs.geojson import points_to_geojson, to_geojson
+
+FARMS = pd.DataFrame(
+    {
+        "Parent company": ["Atlantic Sapphire", "Nordic Aqua", None],
+        "Production Max": [200000.0, np.nan, 8000.0],
+        "Lat": [25.5, 29.9, 58.1],
+        "Long": [-80.4, 121.8, 7.9],
+    },
+    index=[3, 7, 11],
+)
+
+
+def test_points_to_geojson_has_a_point_per_row():
+    geojson = points_to_geojson(FARMS)
+    assert geojson["type"] == "FeatureCollection"
+    assert [feature["id"] for feature in geojson["features"]] == ["3", "7", "11"]
+    first = geojson["features"][0]
+    assert first["geometry"] == {"type": "Point", "coordinates": (-80.4, 25.5)}
+    assert first["bbox"] == (-80.4, 25.5, -80.4, 25.5)
+    assert geojson["bbox"] == (-80.4, 25.5, 121.8, 58.1)
+
+
+def test_the_missing_values_are_null_and_the_properties_can_be_chosen():
+    geojson = points_to_geojson(FARMS, properties=["Parent company", "Production Max"])
+    properties = [feature["properties"] for feature in geojson["features"]]
+    assert properties[1] == {"Parent company": "Nordic Aqua", "Production Max": None}
+    assert properties[2]["Parent company"] is None
+    assert json.loads(json.dumps(geojson))["features"][2]["properties"]["Production Max"] == 8000
+
+
+def test_no_rows_gives_an_empty_collection():
+    geojson = points_to_geojson(FARMS.iloc[:0])
+    assert geojson["features"] == []
+    assert np.isnan(geojson["bbox"]).all()
+
+
+def test_the_same_as_geopandas():
+    geopandas = pytest.importorskip("geopandas")
+    gdf = geopandas.GeoDataFrame(
+        FARMS, geometry=geopandas.points_from_xy(FARMS["Long"], FARMS["Lat"])
+    )
+    assert to_geojson(FARMS) == to_geojson(gdf)
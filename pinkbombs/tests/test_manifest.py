@@ -0,0 +1,50 @@
+from manifest import job_fingerprint, load_manifest, save_manifest
+
+
+def builder(df, top_x=10):
+    return df
+
+
+def entries(tmp_path):
+    for name in ("a", "b"):
+        (tmp_path / f"{name}.csv").write_text("Year,Tonnes\n2000,1\n")
+    return {
+        name: {"filename": f"{name}.csv", "function": builder, "parser": None, "arguments": [5]}
+        for name in ("a", "b")
+    }
+
+
+def fingerprints(entries, tmp_path, options=None):
+    data_dir = str(tmp_path) + "/"
+    return {name: job_fingerprint(entry, options, data_dir) for name, entry in entries.items()}
+
+
+def test_editing_a_csv_changes_only_the_fingerprint_of_its_jobs(tmp_path):
+    registry = entries(tmp_path)
+    before = fingerprints(registry, tmp_path)
+    assert before == fingerprints(registry, tmp_path)
+    (tmp_path / "a.csv").write_text("Year,Tonnes\n2000,2\n")
+    after = fingerprints(registry, tmp_path)
+    assert after["a"] != before["a"] and after["b"] == before["b"]
+
+
+def test_the_arguments_and_the_options_are_part_of_the_fingerprint(tmp_path):
+    entry = entries(tmp_path)["a"]
+    data_dir = str(tmp_path) + "/"
+    reference = job_fingerprint(entry, data_dir=data_dir)
+    assert job_fingerprint({**entry, "arguments": [4]}, data_dir=data_dir) != reference
+    assert job_fingerprint({**entry, "kwargs": {"top_x": 4}}, data_dir=data_dir) != reference
+    assert job_fingerprint({**entry, "precision": 4}, data_dir=data_dir) != reference
+    assert job_fingerprint(entry, {"compact": True}, data_dir) != reference
+
+
+def test_no_fingerprint_without_the_input_file(tmp_path):
+    entry = {**entries(tmp_path)["a"], "filename": "missing.csv"}
+    assert job_fingerprint(entry, data_dir=str(tmp_path) + "/") is None
+
+
+def test_the_manifest_is_saved_in_a_new_directory(tmp_path):
+    path = str(tmp_path / "out" / "manifest.json")
+    assert load_manifest(path) == {}
+    save_manifest({"graphs/en/top-10": "a"}, path)
+    assert load_manifest(path) == {"graphs/en/top-10": "a"}
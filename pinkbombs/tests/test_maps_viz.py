@@ -0,0 +1,103 @@
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from graphs.maps_viz import FARM_COLUMNS, compact_animation, grid_clusters, write_farms_data
+
+
+def random_points(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(40, 70, n), rng.uniform(-20, 30, n))
+
+
+def test_each_point_is_in_one_cluster_at_each_zoom():
+    (lat, lng) = random_points()
+    levels = grid_clusters(lat, lng)
+    assert levels
+    for level in levels:
+        cells = np.array(level["cells"])
+        assert len(cells) == len(lat)
+        counts = np.bincount(cells)
+        # The clusters are numbered from 0 and none is empty
+        assert len(counts) == len(level["centers"])
+        assert counts.min() >= 1
+        assert counts.sum() == len(lat)
+
+
+def test_the_sums_of_the_clusters_add_up_to_the_total():
+    (lat, lng) = random_points()
+    weights = np.random.default_rng(1).uniform(0, 100, len(lat))
+    for level in grid_clusters(lat, lng):
+        sums = np.bincount(level["cells"], weights=weights)
+        assert np.isclose(sums.sum(), weights.sum())
+
+
+def test_close_points_are_grouped_until_they_are_apart():
+    lat = [48.85, 48.86, -33.9]
+    lng = [2.35, 2.36, 18.4]
+    levels = grid_clusters(lat, lng, min_zoom=2, max_zoom=18)
+    (first, last) = (levels[0], levels[-1])
+    assert first["zoom"] == 2
+    assert first["cells"][0] == first["cells"][1] != first["cells"][2]
+    np.testing.assert_allclose(first["centers"][first["cells"][0]], [48.855, 2.355])
+    # The levels stop at the first zoom where every point has its own cell
+    assert last["zoom"] < 18
+    assert grid_clusters(lat, lng, min_zoom=last["zoom"] + 1) == []
+
+
+def test_no_levels_for_points_apart_at_the_first_zoom():
+    assert grid_clusters([10, -40], [0, 100]) == []
+
+
+def animated_map(df):
+    fig = px.scatter_geo(
+        df, locations="alpha-3", hover_name="Country", size="Tonnes", animation_frame="Year"
+    )
+    return compact_animation(fig, df, "alpha-3", "Country", "Year", "Tonnes")
+
+
+def test_compact_animation_has_each_location_once_and_a_size_per_frame():
+    df = pd.DataFrame(
+        {
+            "alpha-3": ["NOR", "CHL", "NOR", "CHL", "SCO"],
+            "Country": ["Norway", "Chile", "Norway", "Chile", "Scotland"],
+            "Year": [2000, 2000, 2001, 2001, 2001],
+            "Tonnes": [10.0, 5.0, 12.0, 6.0, 3.0],
+        }
+    )
+    fig = animated_map(df)
+    assert len(fig.data) == 1
+    assert list(fig.data[0].locations) == ["NOR", "CHL", "SCO"]
+    assert list(fig.data[0].hovertext) == ["Norway", "Chile", "Scotland"]
+    assert [frame.name for frame in fig.frames] == ["2000", "2001"]
+    # Scotland has no data in 2000, its bubble has no size in that frame
+    sizes = [list(frame.data[0].marker.size) for frame in fig.frames]
+    assert sizes == [[10.0, 5.0, 0.0], [12.0, 6.0, 3.0]]
+    assert list(fig.data[0].marker.size) == sizes[0]
+
+
+def farms(n=3):
+    df = pd.DataFrame({column: [f"{column} {i}" for i in range(n)] for column in FARM_COLUMNS})
+    return df.assign(Lat=np.linspace(40, 60, n), Long=np.linspace(-10, 10, n))
+
+
+def test_write_farms_data_writes_the_rows_with_missing_values_as_null(tmp_path):
+    df = farms()
+    df.loc[1, "Species"] = np.nan
+    filename = write_farms_data(df, [], str(tmp_path))
+    data = json.loads((tmp_path / filename).read_text(encoding="utf-8"))
+    assert data["levels"] == []
+    assert len(data["rows"]) == 3
+    row = dict(zip(FARM_COLUMNS, data["rows"][1]))
+    assert row["Species"] is None and row["Lat"] == 50.0 and row["Long"] == 0.0
+
+
+def test_write_farms_data_is_named_after_its_content_and_removes_the_old_versions(tmp_path):
+    first = write_farms_data(farms(), [], str(tmp_path))
+    assert write_farms_data(farms(), [], str(tmp_path)) == first
+    (tmp_path / "ras-map.html").write_text("")
+    second = write_farms_data(farms(4), [], str(tmp_path))
+    assert second != first
+    assert sorted(path.name for path in tmp_path.iterdir()) == [second, "ras-map.html"]
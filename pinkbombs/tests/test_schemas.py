@@ -0,0 +1,41 @@
+import pytest
+
+from graphs.schemas import SchemaError, read_typed_csv
+
+SCHEMA = {
+    "columns": {"Year": "int64", "Tonnes": "float64", "Country": "str"},
+    "decimal": ",",
+    "approximate": ["Tonnes"],
+}
+
+
+def write_csv(tmp_path, text):
+    path = tmp_path / "data.csv"
+    path.write_text(text)
+    return str(path)
+
+
+def test_parses_the_dtypes_and_the_approximate_figures(tmp_path):
+    path = write_csv(tmp_path, 'Year,Tonnes,Country\n2020,"1,5",Norway\n2021,"~2,25",Chile\n')
+    df = read_typed_csv(path, SCHEMA)
+    assert df["Year"].dtype == "int64"
+    assert df["Tonnes"].tolist() == [1.5, 2.25]
+    assert df["Tonnes (approximate)"].tolist() == [False, True]
+
+
+def test_raises_on_a_renamed_column(tmp_path):
+    path = write_csv(tmp_path, "Year,Tons,Country\n2020,1,Norway\n")
+    with pytest.raises(SchemaError, match="columns"):
+        read_typed_csv(path, SCHEMA)
+
+
+def test_raises_on_a_value_of_the_wrong_type(tmp_path):
+    path = write_csv(tmp_path, "Year,Tonnes,Country\nlast year,1,Norway\n")
+    with pytest.raises(SchemaError):
+        read_typed_csv(path, SCHEMA)
+
+
+def test_raises_on_a_missing_value_in_a_column_which_is_not_nullable(tmp_path):
+    path = write_csv(tmp_path, "Year,Tonnes,Country\n2020,1,\n")
+    with pytest.raises(SchemaError, match="missing values in Country"):
+        read_typed_csv(path, SCHEMA)
@@ -0,0 +1,66 @@
+import base64
+
+import numpy as np
+import pytest
+
+from graphs.serialize import TYPED_ARRAY_DTYPES, encode_typed_array, round_significant
+
+
+def decode_typed_array(typed_array):
+    """Returns the values of a plotly.js typed array, as plotly.js reads them"""
+    dtype = {code: name for name, code in TYPED_ARRAY_DTYPES.items()}[typed_array["dtype"]]
+    values = np.frombuffer(base64.b64decode(typed_array["bdata"]), dtype=dtype)
+    if "shape" in typed_array:
+        values = values.reshape([int(n) for n in typed_array["shape"].split(",")])
+    return values
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (0.5381462711076805, 0.5381),
+        (12.3456, 12.35),
+        (-0.000123456, -0.0001235),
+        (123.456, 123.5),
+        (1234.56, 1234.56),
+        (16490.52, 16490.52),
+        (862907.7, 862907.7),
+        (0.0, 0.0),
+    ],
+)
+def test_round_significant(value, expected):
+    assert round_significant(value, 4) == expected
+
+
+def test_round_significant_keeps_the_missing_values():
+    rounded = round_significant(np.array([1.23456, np.nan]), 3)
+    assert rounded[0] == 1.23 and np.isnan(rounded[1])
+
+
+@pytest.mark.parametrize(
+    "values, dtype",
+    [
+        (np.linspace(0, 1, 50), "f8"),
+        (np.arange(20, dtype=float) * 1000, "i2"),
+        (np.arange(-10, 10), "i1"),
+        (np.arange(10) * 10**6, "i4"),
+        (np.arange(10) * 10**10, "f8"),
+    ],
+)
+def test_encode_typed_array_round_trip(values, dtype):
+    typed_array = encode_typed_array(values)
+    assert typed_array["dtype"] == dtype
+    np.testing.assert_array_equal(decode_typed_array(typed_array), values)
+
+
+def test_encode_typed_array_keeps_the_shape():
+    values = np.arange(24, dtype=float).reshape(4, 6) / 7
+    typed_array = encode_typed_array(values)
+    assert typed_array["shape"] == "4,6"
+    np.testing.assert_array_equal(decode_typed_array(typed_array), values)
+
+
+def test_encode_typed_array_leaves_short_and_text_arrays():
+    assert encode_typed_array([1.0, 2.0]) == [1.0, 2.0]
+    text = ["a"] * 10
+    assert encode_typed_array(text) is text
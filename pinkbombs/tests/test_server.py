@@ -0,0 +1,135 @@
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+from server import brotli, create_app, parse_accept_encoding, resolve_arguments
+
+CONTENT = json.dumps({"data": [{"y": list(range(200))}], "layout": {}}).encode()
+
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / "graphs" / "en").mkdir(parents=True)
+    (tmp_path / "graphs" / "en" / "top-10.json").write_bytes(CONTENT)
+    return TestClient(create_app(str(tmp_path), preload=False))
+
+
+def get(client, path, **headers):
+    # The test client decodes the bodies itself unless the encoding is explicit
+    return client.get(path, headers={"accept-encoding": "identity", **headers})
+
+
+def test_identity_body_with_an_etag(client):
+    response = get(client, "/graphs/en/top-10")
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_gzip_body(client):
+    response = client.get("/graphs/en/top-10", headers={"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == CONTENT
+
+
+@pytest.mark.skipif(brotli is None, reason="brotli is not installed")
+def test_brotli_is_preferred_unless_refused(client):
+    response = client.get("/graphs/en/top-10", headers={"accept-encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    response = client.get("/graphs/en/top-10", headers={"accept-encoding": "gzip, br;q=0"})
+    assert response.headers["content-encoding"] == "gzip"
+
+
+def test_each_encoding_has_its_own_etag(client):
+    identity = get(client, "/graphs/en/top-10").headers["etag"]
+    gzipped = get(client, "/graphs/en/top-10", **{"accept-encoding": "gzip"}).headers["etag"]
+    assert identity != gzipped
+
+
+@pytest.mark.parametrize("if_none_match", ["{etag}", "W/{etag}", '"other", {etag}', "*"])
+def test_not_modified_when_the_client_has_the_body(client, if_none_match):
+    etag = get(client, "/graphs/en/top-10").headers["etag"]
+    if_none_match = if_none_match.format(etag=etag)
+    response = get(client, "/graphs/en/top-10", **{"if-none-match": if_none_match})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_full_body_for_another_etag(client):
+    response = get(client, "/graphs/en/top-10", **{"if-none-match": '"stale"'})
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+
+def test_not_found(client):
+    assert get(client, "/graphs/en/unknown").status_code == 404
+    # In the registries but not built
+    assert get(client, "/graphs/fr/top-10").status_code == 404
+
+
+def test_precompressed_sibling_is_served(tmp_path):
+    (tmp_path / "graphs" / "en").mkdir(parents=True)
+    (tmp_path / "graphs" / "en" / "top-10.json").write_bytes(CONTENT)
+    sibling = gzip.compress(CONTENT, 1)
+    (tmp_path / "graphs" / "en" / "top-10.json.gz").write_bytes(sibling)
+    client = TestClient(create_app(str(tmp_path), preload=False))
+    response = client.get("/graphs/en/top-10", headers={"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == CONTENT
+    body = client.app.state.cache.lookup(str(tmp_path / "graphs" / "en" / "top-10.json"))
+    assert body.variants["gzip"][0] == sibling
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip, br;q=0") == {"gzip"}
+    assert parse_accept_encoding("GZIP;q=0.5, deflate") == {"gzip", "deflate"}
+    assert parse_accept_encoding("*") == {"*", "br", "gzip"}
+    assert parse_accept_encoding(None) == set()
+
+
+def builder(df, top_x=10, share=0.5, title="Top"):
+    return df
+
+
+ENTRY = {"function": builder, "arguments": [5]}
+
+
+def test_resolve_arguments_converts_to_the_type_of_the_parameter():
+    assert resolve_arguments(ENTRY, {}) == [5, 0.5, "Top"]
+    assert resolve_arguments(ENTRY, {"top_x": "4.0", "share": "1"}) == [4, 1.0, "Top"]
+
+
+def test_resolve_arguments_includes_the_kwargs_of_the_entry():
+    entry = {**ENTRY, "kwargs": {"title": "Best", "share": 0.25}}
+    assert resolve_arguments(entry, {"share": "0.75"}) == [5, 0.75, "Best"]
+
+
+@pytest.mark.parametrize(
+    "overrides", [{"top_x": "4.5"}, {"top_x": "four"}, {"share": "nan"}, {"title": "1"}]
+)
+def test_resolve_arguments_rejects_invalid_values(overrides):
+    with pytest.raises(ValueError):
+        resolve_arguments(ENTRY, overrides)
+
+
+def test_render_errors(client, tmp_path, monkeypatch):
+    source = tmp_path / "top_10.csv"
+    source.write_text("x\n")
+    monkeypatch.setattr(server, "input_path", lambda job: str(source))
+
+    def render_job(job, arguments=None):
+        raise RuntimeError("internal details")
+
+    monkeypatch.setattr(server, "render_job", render_job)
+    # The validation of the arguments is the client's error
+    assert get(client, "/render/graphs/en/top-10?unknown=1").status_code == 400
+    # A failing builder is the server's, and its exception is not sent
+    response = get(client, "/render/graphs/en/top-10")
+    assert response.status_code == 500
+    assert "internal details" not in response.text
@@ -0,0 +1,48 @@
+import os
+
+import pandas as pd
+
+from translate import country_index, translate_frame
+
+COUNTRIES_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "country_pays.csv")
+
+TRANSLATION = {
+    "columns": {"Year": "Année", "Country": "Pays", "Tonnes": "Tonnes de saumons"},
+    "countries": ["Country"],
+}
+INDEX = {"Norway": "Norvège", "Russian Federation": "Russie", "Russia": "Russie"}
+
+
+def test_renames_and_orders_the_columns_and_translates_the_countries():
+    input_df = pd.DataFrame(
+        {
+            "Tonnes": [1.0, 2.0, 3.0],
+            "Country": ["Norway", "Russia", "Atlantis"],
+            "Year": [2020, 2021, 2022],
+            "Unused": ["a", "b", "c"],
+        }
+    )
+    output_df = translate_frame(input_df, TRANSLATION, INDEX)
+    assert list(output_df.columns) == ["Année", "Pays", "Tonnes de saumons"]
+    # The unknown names are kept as they are
+    assert output_df["Pays"].tolist() == ["Norvège", "Russie", "Atlantis"]
+    assert output_df["Année"].tolist() == [2020, 2021, 2022]
+
+
+def test_does_not_modify_its_input():
+    input_df = pd.DataFrame({"Year": [2020], "Country": ["Norway"], "Tonnes": [1.0]})
+    translate_frame(input_df, TRANSLATION, INDEX)
+    assert input_df.columns.tolist() == ["Year", "Country", "Tonnes"]
+    assert input_df["Country"].tolist() == ["Norway"]
+
+
+def test_translation_without_countries():
+    input_df = pd.DataFrame({"Year": [2020], "Country": ["Norway"], "Tonnes": [1.0]})
+    output_df = translate_frame(input_df, {"columns": {"Country": "Pays"}})
+    assert output_df.to_dict("list") == {"Pays": ["Norway"]}
+
+
+def test_country_index_names_the_aliases_as_their_country():
+    index = country_index(COUNTRIES_PATH)
+    assert index["Russia"] == index["Russian Federation"] == "Russie"
+    assert index["Korea, Dem. People's Rep"] == "Corée du Nord"
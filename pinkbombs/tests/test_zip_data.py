@@ -0,0 +1,61 @@
+import json
+import os
+import zipfile
+
+from zip_data import checksums_path, zip_files
+
+
+def csv_files(directory, count=3):
+    directory.mkdir()
+    paths = []
+    for i in range(count):
+        path = directory / f"data_{i}.csv"
+        path.write_text("Year,Tonnes\n" + "".join(f"{year},{year * i}\n" for year in range(2000)))
+        paths.append(str(path))
+    return paths
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_the_archives_are_byte_identical_across_runs(tmp_path):
+    paths = csv_files(tmp_path / "data")
+    first = zip_files(paths, str(tmp_path / "first"))
+    # Another time, in parallel and with other modification times
+    for path in paths:
+        os.utime(path, (1e9, 1e9))
+    second = zip_files(paths, str(tmp_path / "second"), n_jobs=2)
+    assert [read_bytes(path) for path in first] == [read_bytes(path) for path in second]
+    with zipfile.ZipFile(first[0]) as archive:
+        assert archive.namelist() == ["data_0.csv"]
+        assert archive.read("data_0.csv") == read_bytes(paths[0])
+
+
+def test_only_the_changed_or_modified_archives_are_written_again(tmp_path):
+    paths = csv_files(tmp_path / "data")
+    out_dir = str(tmp_path / "csv")
+    assert len(zip_files(paths, out_dir)) == 3
+    assert zip_files(paths, out_dir) == []
+
+    with open(paths[0], "a") as f:
+        f.write("2000,1\n")
+    with open(os.path.join(out_dir, "data_1.csv.zip"), "ab") as f:
+        f.write(b"\0")
+    written = zip_files(paths, out_dir)
+    assert [os.path.basename(path) for path in written] == ["data_0.csv.zip", "data_1.csv.zip"]
+    assert len(zip_files(paths, out_dir, force=True)) == 3
+
+
+def test_the_checksums_only_list_the_current_files(tmp_path):
+    paths = csv_files(tmp_path / "data")
+    out_dir = str(tmp_path / "csv")
+    zip_files(paths, out_dir)
+    zip_files(paths[1:], out_dir)
+    with open(checksums_path(out_dir)) as f:
+        checksums = json.load(f)
+    assert sorted(checksums) == ["data_1.csv.zip", "data_2.csv.zip"]
+    assert checksums["data_1.csv.zip"]["size"] == os.path.getsize(
+        os.path.join(out_dir, "data_1.csv.zip")
+    )
@@ -0,0 +1,247 @@
+from manifest import MANIFEST_PATH, hash_file, load_manifest, save_manifest
+from functools import lru_cache
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+import pandas as pd
+
+# English and French names of the countries, columns name_eng and name_fr
+COUNTRIES_PATH = "data/country_pays.csv"
+
+# Names used by the source datasets for countries named differently in country_pays.csv
+COUNTRY_ALIASES = {
+    "Korea, Dem. People's Rep": "Democratic People's Republic of Korea",
+    "Türkiye": "Turkey",
+    "USA": "United States of America",
+    "Russia": "Russian Federation",
+}
+
+# French names replacing the ones of country_pays.csv, and the regions which are not countries
+FRENCH_NAMES = {
+    "Democratic People's Republic of Korea": "Corée du Nord",
+    "Russian Federation": "Russie",
+    "Scotland": "Ecosse",
+}
+
+# Translations of the datasets, keyed by the English file in data/
+# columns: French name of each column kept, in the order of the French file
+# countries: columns whose values are English country names, translated with the country index
+# The other _fr.csv files are translated by hand in the Google sheet.
+TRANSLATIONS = {
+    "numbers_salmons_farmed_1.0.csv": {
+        "columns": {
+            "Year": "Année",
+            "Tonnes - live weight": "Tonnes de saumon produit en élevage",
+            "Number of salmons (5kg each)": "Nombre de saumons (5kg chacun)",
+        },
+    },
+    "discrease_wild_salmon_1.1.csv": {
+        "columns": {
+            "Year": "Année",
+            "Tons of wild salmon catch in Atlantic waters": (
+                "Saumons pêchés dans l'Atlantique en tonnes"
+            ),
+        },
+    },
+    "hyper_growth_salmon_farming_1.2.csv": {
+        "columns": {
+            "Year": "Année",
+            "Tonnes - live weight": "Tonnes de saumons produits en élevage",
+            "Country": "Pays",
+        },
+        "countries": ["Country"],
+    },
+    "top_10_countries_producing_1.3.csv": {
+        "columns": {
+            "Flag": "Drapeau",
+            "Country": "Pays",
+            "Tons": "Tonnes de saumon",
+            "% of total": "% du total",
+        },
+        "countries": ["Country"],
+    },
+    "evolution_salmon_farming_country_iso_1.4.csv": {
+        "columns": {
+            "Year": "Année",
+            "Country": "Pays",
+            "Tonnes - live weight": "Tonnes de saumons",
+            "alpha-3": "alpha-3",
+        },
+        "countries": ["Country"],
+    },
+    "top_15_countries_consuming_1.5.csv": {
+        "columns": {
+            "Country": "Pays",
+            "Flag": "Drapeau",
+            "Apparent consumption": "Consommation apparente",
+            "Apparent consumption per capita": "Consommation apparente par habitant",
+            "Production (Capture + Aquaculture)": "Production (Capture + Aquaculture)",
+            "Export": "Export",
+            "Import": "Import",
+        },
+        "countries": ["Country"],
+    },
+    "top_10_companies_producing_2.1.csv": {
+        "columns": {
+            "Company": "Producteur",
+            "Flag": "Drapeau",
+            "Country": "Pays",
+            "Volume, in tons, 2022": "Tonnes de saumon 2022",
+            "Commercial name": "Nom commercial",
+            "Creation date": "Date de création",
+            "Headquarters": "Siège",
+            "Website": "Site internet",
+            "Revenues 2022": "Revenus 2022",
+            "Employees 2022": "Employés 2022",
+            "Note": "Note",
+        },
+    },
+    "mortality_rates_4.4.csv": {
+        "columns": {
+            "Year": "Année",
+            "Company": "Producteur",
+            "Area": "Région",
+            "Mortality_rate": "Taux de mortalité",
+        },
+        "countries": ["Area"],
+    },
+}
+
+
+def translated_filename(filename):
+    """Returns the name of the French file of a dataset, e.g. 'mortality_rates_4.4_fr.csv'"""
+    (root, extension) = os.path.splitext(filename)
+    return root + "_fr" + extension
+
+
+@lru_cache(maxsize=None)
+def country_index(path=COUNTRIES_PATH):
+    """Returns the French name of each country by its English name and by its aliases
+    Built once and shared by all the datasets.
+    """
+    countries = pd.read_csv(path, usecols=["name_eng", "name_fr"])
+    index = dict(zip(countries["name_eng"], countries["name_fr"]))
+    index.update(FRENCH_NAMES)
+    for alias, name in COUNTRY_ALIASES.items():
+        index[alias] = index[name]
+    return index
+
+
+def translate_countries(names, index):
+    """Returns the French names of a Series of English names, the unknown ones left as they are"""
+    return names.map(index).fillna(names)
+
+
+def translate_frame(input_df, translation, index=None):
+    """Returns the French version of a dataset
+    Parameters:
+            input_df (pd.DataFrame): English dataset
+            translation (dict): entry of TRANSLATIONS
+            index (dict): country index, default is None which uses the one of COUNTRIES_PATH
+    Returns:
+            output_df (pd.DataFrame): columns of the translation, renamed and in its order
+    """
+    columns = translation["columns"]
+    output_df = input_df[list(columns)]
+    if translation.get("countries"):
+        index = country_index() if index is None else index
+        output_df = output_df.assign(
+            **{
+                column: translate_countries(output_df[column], index)
+                for column in translation["countries"]
+            }
+        )
+    return output_df.rename(columns=columns)
+
+
+def translation_fingerprint(filename, data_dir="data/"):
+    """Returns a fingerprint of the source of a translation, of its mapping and of the country
+    table if it uses it, None if the source is missing
+    """
+    path = data_dir + filename
+    if not os.path.exists(path):
+        return None
+    translation = TRANSLATIONS[filename]
+    digest = hashlib.sha256()
+    digest.update(hash_file(path).encode())
+    digest.update(json.dumps(translation).encode())
+    if translation.get("countries"):
+        digest.update(hash_file(COUNTRIES_PATH).encode())
+        digest.update(json.dumps([COUNTRY_ALIASES, FRENCH_NAMES]).encode())
+    return digest.hexdigest()
+
+
+def translation_key(filename):
+    """Returns the key of a translation in the manifest, e.g. 'translations/top_10_..._fr.csv'"""
+    return "translations/" + translated_filename(filename)
+
+
+def stale_translations(filenames, manifest, data_dir="data/"):
+    """Returns the fingerprints of the translations whose source or mapping changed since they
+    were written, or whose French file is missing
+    """
+    fingerprints = {filename: translation_fingerprint(filename, data_dir) for filename in filenames}
+    return {
+        filename: fingerprint
+        for (filename, fingerprint) in fingerprints.items()
+        if fingerprint is not None
+        and (
+            manifest.get(translation_key(filename)) != fingerprint
+            or not os.path.exists(data_dir + translated_filename(filename))
+        )
+    }
+
+
+def translate(filenames=None, force=False, data_dir="data/", manifest_path=MANIFEST_PATH):
+    """Writes the French files of the datasets whose source or mapping changed
+    Parameters:
+            filenames (list(str)): English files to translate, default is None for all of them
+            force (bool): write them even if they are up to date, default is False
+            data_dir (str): directory of the datasets, default is 'data/'
+            manifest_path (str): manifest recording the fingerprints of the translations
+    Returns:
+            paths (list(str)): French files written
+    """
+    filenames = list(TRANSLATIONS) if filenames is None else filenames
+    manifest = load_manifest(manifest_path)
+    todo = stale_translations(filenames, {} if force else manifest, data_dir)
+
+    paths = []
+    for filename, fingerprint in todo.items():
+        output_df = translate_frame(pd.read_csv(data_dir + filename), TRANSLATIONS[filename])
+        path = data_dir + translated_filename(filename)
+        tmp_path = path + ".tmp"
+        output_df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        manifest[translation_key(filename)] = fingerprint
+        paths.append(path)
+
+    if todo:
+        save_manifest(manifest, manifest_path)
+    return paths
+
+
+def sources_of(filenames):
+    """Returns the English files whose translations are among filenames, e.g. job inputs"""
+    return [source for source in TRANSLATIONS if translated_filename(source) in filenames]
+
+
+def main(argv=None):
+    """Runs the command line interface, returns the exit code"""
+    parser = argparse.ArgumentParser(description="Translate the datasets into French")
+    parser.add_argument(
+        "--force", action="store_true", help="write every French file, even the up to date ones"
+    )
+    args = parser.parse_args(argv)
+    paths = translate(force=args.force)
+    for path in paths:
+        print(path)
+    print(f"{len(paths)} file(s) translated, {len(TRANSLATIONS) - len(paths)} up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+from manifest import hash_file, load_manifest, save_manifest
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import os
+import shutil
+import sys
+import zipfile
+
+# Script to zip the csv files of data/ for download from pinkbombs.org
+
+DATA_DIR = "data"
+DOWNLOAD_DIR = "download/csv"
+
+# Timestamp of every zip entry, the earliest one zip supports, so that an archive only
+# changes when the bytes of its csv file do
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def archive_path(path, out_dir=DOWNLOAD_DIR):
+    """Returns the path of the archive of a csv file, e.g. 'download/csv/x.csv.zip'"""
+    return os.path.join(out_dir, os.path.basename(path) + ".zip")
+
+
+def checksums_path(out_dir=DOWNLOAD_DIR):
+    """Returns the path of the checksums of the archives, next to them"""
+    return os.path.join(out_dir, "checksums.json")
+
+
+def zip_file(path, target):
+    """Writes a csv file as the single entry of a zip archive, streaming its raw bytes
+    Parameters:
+            path (str): csv file
+            target (str): archive to write
+    Returns:
+            checksums (dict): sha256 of the csv file ('source') and of the archive ('sha256'),
+                and the bytes of the archive ('size')
+    """
+    info = zipfile.ZipInfo(os.path.basename(path), date_time=ZIP_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.create_system = 3
+    info.external_attr = 0o644 << 16
+    info.file_size = os.path.getsize(path)
+
+    tmp_path = target + ".tmp"
+    with zipfile.ZipFile(tmp_path, "w", compresslevel=9) as archive:
+        with open(path, "rb") as source, archive.open(info, "w") as entry:
+            shutil.copyfileobj(source, entry, 1 << 20)
+    os.replace(tmp_path, target)
+    return {"source": hash_file(path), "sha256": hash_file(target), "size": os.path.getsize(target)}
+
+
+def is_up_to_date(path, target, checksums):
+    """Returns whether the archive was written from the current bytes of the csv file and was
+    not modified since
+    """
+    return (
+        checksums is not None
+        and os.path.exists(target)
+        and checksums["source"] == hash_file(path)
+        and checksums["sha256"] == hash_file(target)
+    )
+
+
+def zip_files(paths, out_dir=DOWNLOAD_DIR, n_jobs=1, force=False):
+    """Writes the archives of the csv files whose bytes changed, and their checksums
+    Parameters:
+            paths (list(str)): csv files
+            out_dir (str): directory of the archives, default is 'download/csv'
+            n_jobs (int): number of worker processes, 1 zips in this process. Default is 1.
+            force (bool): write every archive, even the up to date ones. Default is False.
+    Returns:
+            written (list(str)): archives written
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    previous = {} if force else load_manifest(checksums_path(out_dir))
+    targets = {path: archive_path(path, out_dir) for path in paths}
+    todo = [
+        path
+        for path, target in targets.items()
+        if not is_up_to_date(path, target, previous.get(os.path.basename(target)))
+    ]
+
+    if n_jobs == 1 or len(todo) < 2:
+        results = [zip_file(path, targets[path]) for path in todo]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(zip_file, todo, [targets[path] for path in todo]))
+
+    # The checksums only list the archives of the current csv files
+    checksums = {
+        os.path.basename(target): previous[os.path.basename(target)]
+        for path, target in targets.items()
+        if path not in todo
+    }
+    for path, result in zip(todo, results):
+        checksums[os.path.basename(targets[path])] = result
+    save_manifest(checksums, checksums_path(out_dir))
+    return [targets[path] for path in todo]
+
+
+def csv_files(data_dir=DATA_DIR):
+    """Returns the csv files of a directory, sorted"""
+    return sorted(
+        os.path.join(data_dir, filename)
+        for filename in os.listdir(data_dir)
+        if filename.endswith(".csv")
+    )
+
+
+def main(argv=None):
+    """Runs the command line interface, returns the exit code"""
+    parser = argparse.ArgumentParser(description="Zip the csv files for download")
+    parser.add_argument(
+        "--out", default=DOWNLOAD_DIR, help=f"directory of the archives (default: {DOWNLOAD_DIR})"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes, 0 uses all the cores (default: 1)",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="zip every file, even the up to date ones"
+    )
+    args = parser.parse_args(argv)
+
+    paths = csv_files()
+    n_jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+    written = zip_files(paths, args.out, n_jobs, args.force)
+    for target in written:
+        print("Files converted: ", target)
+    print(f"{len(written)} archive(s) written, {len(paths) - len(written)} up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())